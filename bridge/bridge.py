@@ -1,10 +1,26 @@
 import os
 import time
 import logging
-import requests
+import asyncio
 import serial
-import queue
 import threading
+import json
+import itertools
+import heapq
+import collections
+import sqlite3
+import uuid
+import socket
+import random
+import functools
+import math
+import re
+import unicodedata
+import contextvars
+import urllib.parse
+import yaml
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
 # -------------------------
 # Disable exclusive serial lock
@@ -39,6 +55,14 @@ def env_int(name, default):
         return default
 
 
+def env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        print(f"{name} invalid. Using default {default}")
+        return default
+
+
 def env_bool(name, default):
     val = os.environ.get(name)
     if val is None:
@@ -49,11 +73,10 @@ def env_bool(name, default):
 # Environment config
 # -------------------------
 
-SIGNAL_GROUP_ID = os.environ["SIGNAL_GROUP_ID"]
-MESH_DEVICE = os.environ["MESH_DEVICE"]
+SIGNAL_GROUP_ID = os.environ.get("SIGNAL_GROUP_ID", "")
+MESH_DEVICE = os.environ.get("MESH_DEVICE", "")
 MESH_CHANNEL_INDEX = int(os.environ["MESH_CHANNEL_INDEX"])
 POLL_INTERVAL = int(os.environ["SIGNAL_POLL_INTERVAL"])
-NODE_DB_WARMUP = int(os.environ["NODE_DB_WARMUP"])
 SIGNAL_SHORT_NAMES = os.environ["SIGNAL_SHORT_NAMES"].lower() == "true"
 
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
@@ -69,9 +92,140 @@ if MESH_TO_SIGNAL not in ("on", "echo", "off"):
 DEV_MODE = env_bool("DEV_MODE", False)
 
 SIGNAL_FILTER_ENABLED = env_bool("SIGNAL_FILTER_ENABLED", True)
-SIGNAL_FILTER_CHARS = list(os.environ.get("SIGNAL_FILTER_CHARS", "\U0001f4e2"))
-
-SIGNAL_RPC_URL = "http://localhost:8080/api/v1/rpc"
+#characters are matched as whole grapheme clusters (see Sender authorization)
+SIGNAL_FILTER_CHARS = os.environ.get("SIGNAL_FILTER_CHARS", "\U0001f4e2")
+
+#Signal numbers or UUIDs, comma-separated: allowed senders skip the filter characters,
+#denied senders never reach the mesh
+SIGNAL_ALLOW_SENDERS = {s.strip() for s in os.environ.get("SIGNAL_ALLOW_SENDERS", "").split(",") if s.strip()}
+SIGNAL_DENY_SENDERS = {s.strip() for s in os.environ.get("SIGNAL_DENY_SENDERS", "").split(",") if s.strip()}
+
+SIGNAL_HTTP_URL = os.environ.get("SIGNAL_HTTP_URL", "http://localhost:8080").rstrip("/")
+SIGNAL_RPC_PATH = "/api/v1/rpc"
+SIGNAL_EVENTS_PATH = "/api/v1/events"
+
+#stream = subscribe to signal-cli's SSE event stream (daemon runs --receive-mode on-connection)
+#poll = old behaviour, call "receive" every SIGNAL_POLL_INTERVAL seconds (daemon runs --receive-mode manual)
+SIGNAL_RECEIVE_MODE = os.environ.get("SIGNAL_RECEIVE_MODE", "stream").lower()
+if SIGNAL_RECEIVE_MODE not in ("stream", "poll"):
+    SIGNAL_RECEIVE_MODE = "stream"
+
+#seconds of silence on the event stream before we drop it and resubscribe
+SIGNAL_STREAM_IDLE_TIMEOUT = env_int("SIGNAL_STREAM_IDLE_TIMEOUT", 300)
+
+#outbound Signal stage: worker threads, max JSON-RPC calls per HTTP request, max pending calls
+#more than one worker can reorder messages in the group, so 1 is the default
+SIGNAL_RPC_TIMEOUT = env_int("SIGNAL_RPC_TIMEOUT", 30)
+SIGNAL_TX_WORKERS = max(1, env_int("SIGNAL_TX_WORKERS", 1))
+SIGNAL_RPC_BATCH_MAX = max(1, env_int("SIGNAL_RPC_BATCH_MAX", 10))
+SIGNAL_TX_QUEUE_MAX = max(1, env_int("SIGNAL_TX_QUEUE_MAX", 100))
+
+#mesh → Signal outbox: resends after a failed send (first after SIGNAL_TX_BACKOFF seconds, doubling,
+#jittered, capped), seconds a message may wait before it is dropped (0 = no limit), and the circuit
+#breaker: failed sends in a row that open it, seconds it stays open before one trial send
+SIGNAL_TX_RETRIES = max(0, env_int("SIGNAL_TX_RETRIES", 5))
+SIGNAL_TX_BACKOFF = max(0.1, env_float("SIGNAL_TX_BACKOFF", 2))
+SIGNAL_TX_BACKOFF_MAX = 60
+SIGNAL_TX_TTL = env_int("SIGNAL_TX_TTL", 3600)
+SIGNAL_BREAKER_THRESHOLD = max(1, env_int("SIGNAL_BREAKER_THRESHOLD", 3))
+SIGNAL_BREAKER_COOLDOWN = max(1, env_int("SIGNAL_BREAKER_COOLDOWN", 15))
+
+#mesh TX pacing: share of airtime the bridge may use (percent, 0 = no budget),
+#gap after a packet as a multiple of its time-on-air, the floor on that gap (seconds),
+#and the channel utilization (percent) above which the bridge starts backing off
+MESH_DUTY_CYCLE = env_float("MESH_DUTY_CYCLE", 20)
+MESH_TX_SPACING = env_float("MESH_TX_SPACING", 2.0)
+MESH_TX_MIN_GAP = env_float("MESH_TX_MIN_GAP", 1.0)
+MESH_CHUTIL_TARGET = env_float("MESH_CHUTIL_TARGET", 25)
+
+#more than one radio: comma-separated device paths (replaces MESH_DEVICE). Outbound packets are
+#spread by MESH_TX_POLICY: airtime = whichever radio is free first, round_robin = radios take turns.
+#MESH_TX_PINS ("channel=device,...") keeps a channel on one radio while that radio is up
+MESH_DEVICES = [d.strip() for d in os.environ.get("MESH_DEVICES", "").split(",") if d.strip()] or [MESH_DEVICE]
+MESH_TX_POLICY = os.environ.get("MESH_TX_POLICY", "airtime").lower()
+MESH_TX_PINS = os.environ.get("MESH_TX_PINS", "")
+
+#serial link supervision: a radio whose sendText or heartbeat fails or takes longer than
+#MESH_RADIO_TIMEOUT seconds, or whose connection drops, is reconnected. Its traffic waits (or goes
+#to the other radios) meanwhile. Reconnect attempts back off from 1s to MESH_RADIO_RETRY seconds.
+#MESH_HEARTBEAT_INTERVAL: seconds between link checks on an idle radio (0 = off)
+MESH_RADIO_TIMEOUT = env_float("MESH_RADIO_TIMEOUT", 20)
+MESH_RADIO_RETRY = max(1, env_int("MESH_RADIO_RETRY", 30))
+MESH_HEARTBEAT_INTERVAL = env_int("MESH_HEARTBEAT_INTERVAL", 60)
+
+#max text bytes in one mesh packet (firmware limit is 233 bytes of Data payload, minus protobuf framing)
+MESH_MAX_PAYLOAD = env_int("MESH_MAX_PAYLOAD", 200)
+
+#seconds to hold a Signal relay so queued relays behind it can share its packet (0 = off)
+MESH_COALESCE_WINDOW = env_float("MESH_COALESCE_WINDOW", 0)
+
+#max packets one long Signal message may be split into; the rest is cut off with "…"
+MESH_MAX_SEGMENTS = max(1, env_int("MESH_MAX_SEGMENTS", 3))
+
+#mesh TX queue limits: seconds each traffic class may wait before it is dropped (0 = no limit),
+#max queued messages, and what to shed when full ("lowest" priority first, or "oldest" overall)
+MESH_TTL_ALERT = env_int("MESH_TTL_ALERT", 1800)
+MESH_TTL_RELAY = env_int("MESH_TTL_RELAY", 600)
+MESH_TTL_REPLY = env_int("MESH_TTL_REPLY", 120)
+MESH_TX_MAX_DEPTH = max(1, env_int("MESH_TX_MAX_DEPTH", 50))
+MESH_TX_DROP_POLICY = os.environ.get("MESH_TX_DROP_POLICY", "lowest").lower()
+if MESH_TX_DROP_POLICY not in ("lowest", "oldest"):
+    MESH_TX_DROP_POLICY = "lowest"
+
+#Signal senders with one of these in their profile name are operators; their messages jump the mesh queue
+SIGNAL_ALERT_CHARS = os.environ.get("SIGNAL_ALERT_CHARS", "")
+
+#bridge state lives next to signal-cli's data so it survives on the same mounted volume
+BRIDGE_DATA_DIR = os.environ.get("BRIDGE_DATA_DIR", "/root/.local/share/signal-cli/bridge")
+
+#keep queued mesh messages on disk so a restart resends them; writes are grouped every N ms
+MESH_TX_PERSIST = env_bool("MESH_TX_PERSIST", False)
+MESH_TX_PERSIST_FLUSH_MS = max(1, env_int("MESH_TX_PERSIST_FLUSH_MS", 50))
+
+#same for the mesh → Signal outbox, so reports from the mesh survive a restart while signal-cli is down
+SIGNAL_TX_PERSIST = env_bool("SIGNAL_TX_PERSIST", False)
+
+#ask the radio for delivery acks on Signal → Mesh packets and resend the ones nobody acked:
+#seconds to wait for an ack, max resends per packet, first resend delay (doubles each time, capped)
+MESH_WANT_ACK = env_bool("MESH_WANT_ACK", False)
+MESH_ACK_TIMEOUT = env_int("MESH_ACK_TIMEOUT", 60)
+MESH_ACK_RETRIES = max(0, env_int("MESH_ACK_RETRIES", 2))
+MESH_ACK_BACKOFF = env_int("MESH_ACK_BACKOFF", 30)
+MESH_ACK_BACKOFF_MAX = 300
+
+#command replies: direct = sent to the node that asked (one routed packet), broadcast = to the whole channel.
+#MESH_REPLY_FALLBACK: a direct reply the node does not acknowledge within MESH_ACK_TIMEOUT is broadcast instead
+MESH_REPLY_MODE = os.environ.get("MESH_REPLY_MODE", "direct").lower()
+MESH_REPLY_FALLBACK = env_bool("MESH_REPLY_FALLBACK", False)
+
+#max Signal → Mesh messages per rolling hour, per sender and for the whole group (0 = unlimited),
+#and how often (seconds) one sender may be told they are limited
+SIGNAL_RATE_LIMIT_USER = max(0, env_int("SIGNAL_RATE_LIMIT_USER", 0))
+SIGNAL_RATE_LIMIT_GLOBAL = max(0, env_int("SIGNAL_RATE_LIMIT_GLOBAL", 0))
+SIGNAL_RATE_LIMIT_NOTICE_COOLDOWN = env_int("SIGNAL_RATE_LIMIT_NOTICE_COOLDOWN", 600)
+
+#mesh → Signal digests: relays per minute into one group above which they are collected (0 = off),
+#seconds each digest collects for, and the longest digest message in characters
+SIGNAL_DIGEST_RATE = max(0, env_int("SIGNAL_DIGEST_RATE", 0))
+SIGNAL_DIGEST_WINDOW = max(1, env_int("SIGNAL_DIGEST_WINDOW", 60))
+SIGNAL_DIGEST_MAX_CHARS = max(200, env_int("SIGNAL_DIGEST_MAX_CHARS", 2000))
+
+#mesh ingress budget: messages per minute and burst per node, messages per minute for the whole
+#channel (0 = off), seconds a node over its budget is ignored, and whether nodes that flooded
+#recently get error replies ("Unknown command" etc.) at all
+MESH_INGRESS_NODE_RATE = env_float("MESH_INGRESS_NODE_RATE", 0)
+MESH_INGRESS_NODE_BURST = max(1, env_int("MESH_INGRESS_NODE_BURST", 5))
+MESH_INGRESS_GLOBAL_RATE = env_float("MESH_INGRESS_GLOBAL_RATE", 0)
+MESH_INGRESS_DENY_SECONDS = env_int("MESH_INGRESS_DENY_SECONDS", 300)
+MESH_INGRESS_SILENT = env_bool("MESH_INGRESS_SILENT", True)
+
+#port for the Prometheus-style /metrics endpoint (0 = off)
+METRICS_PORT = env_int("METRICS_PORT", 0)
+
+#seconds to wait for signal-cli to answer on startup before starting anyway, and the file
+#written once the bridge is relaying (container health check)
+SIGNAL_STARTUP_TIMEOUT = env_int("SIGNAL_STARTUP_TIMEOUT", 120)
+BRIDGE_READY_FILE = os.environ.get("BRIDGE_READY_FILE", "/tmp/bridge.ready")
 
 PRIMARY_BLOCK_MESSAGE = (
     "[BRIDGE] Signal → Mesh relay is disabled while MESH_CHANNEL_INDEX=0 (Primary). "
@@ -81,11 +235,21 @@ PRIMARY_BLOCK_MESSAGE = (
 COMMAND_PREFIX = "!"
 BRIDGE_PREFIX = "BRIDGE"
 
+#optional YAML/JSON routing table mapping Signal groups to mesh channels; without one the bridge
+#runs a single route built from SIGNAL_GROUP_ID, MESH_CHANNEL_INDEX, RELAY_MODE and SIGNAL_FILTER_*
+BRIDGE_ROUTES_FILE = os.environ.get("BRIDGE_ROUTES_FILE", "")
+
+#active/standby pair: a SQLite file both bridges can reach, this bridge's name in it (unique per
+#bridge), and seconds a leader's lease lasts without renewal. Empty file = no standby, always relay
+BRIDGE_HA_LEASE_FILE = os.environ.get("BRIDGE_HA_LEASE_FILE", "")
+BRIDGE_HA_NODE_ID = os.environ.get("BRIDGE_HA_NODE_ID") or socket.gethostname()
+BRIDGE_HA_LEASE_SECONDS = max(3, env_int("BRIDGE_HA_LEASE_SECONDS", 10))
+
 # -------------------------
 # Runtime relay state
 # -------------------------
 
-RELAY_ENABLED = True
+#mode routes start in; each route then keeps its own mode and on/off state (see ROUTES)
 RELAY_MODE = env_int("RELAY_MODE", 2)
 
 # -------------------------
@@ -98,41 +262,1207 @@ logging.basicConfig(
 )
 log = logging.getLogger("bridge")
 
+if MESH_REPLY_MODE not in ("direct", "broadcast"):
+    log.warning("MESH_REPLY_MODE=%s is invalid. Defaulting to direct.", MESH_REPLY_MODE)
+    MESH_REPLY_MODE = "direct"
+
+if MESH_TX_POLICY not in ("airtime", "round_robin"):
+    log.warning("MESH_TX_POLICY=%s is invalid. Defaulting to airtime.", MESH_TX_POLICY)
+    MESH_TX_POLICY = "airtime"
+
+#channel index -> device path
+_pins = {}
+for _pin in filter(None, (p.strip() for p in MESH_TX_PINS.split(","))):
+    _channel, _, _device = _pin.partition("=")
+    if not _channel.strip().isdigit() or _device.strip() not in MESH_DEVICES:
+        log.warning("MESH_TX_PINS: ignoring %r (want channel=device, device one of MESH_DEVICES)", _pin)
+        continue
+    _pins[int(_channel)] = _device.strip()
+MESH_TX_PINS = _pins
+
 #!we'll obv have to update this for mode 4
 if RELAY_MODE not in (1, 2, 3):
     log.warning("RELAY_MODE=%s is invalid. Defaulting to 2.", RELAY_MODE)
     RELAY_MODE = 2
 
+# -------------------------
+# Routing table
+# -------------------------
+#a route joins one Signal group to one mesh channel; a group may feed several channels and a
+#channel several groups. Each route has its own direction, mode, on/off state and sender filter.
+#Lookups on the receive paths are one dict hit: ROUTES_BY_GROUP / ROUTES_BY_CHANNEL
+
+ROUTE_DIRECTIONS = ("both", "signal_to_mesh", "mesh_to_signal")
+
+def make_route(name, group, channel, direction="both", mode=None, filter_chars=None):
+    if direction not in ROUTE_DIRECTIONS:
+        raise ValueError(f"route {name}: direction must be one of {', '.join(ROUTE_DIRECTIONS)}")
+    mode = RELAY_MODE if mode is None else int(mode)
+    if mode not in (1, 2, 3):
+        raise ValueError(f"route {name}: mode must be 1, 2 or 3")
+    if filter_chars is None:
+        filter_chars = SIGNAL_FILTER_CHARS if SIGNAL_FILTER_ENABLED else ""
+    if not isinstance(filter_chars, (str, list)):
+        raise ValueError(f"route {name}: filter must be a string or a list of strings")
+    return {
+        "name": str(name),
+        "group": str(group),
+        "channel": int(channel),
+        "direction": direction,
+        "mode": mode,
+        "enabled": True,
+        #a string of filter characters or a list of tokens; compiled by compile_filter()
+        "filter": filter_chars,
+    }
+
+
+def load_routes():
+    if not BRIDGE_ROUTES_FILE:
+        return [make_route("default", SIGNAL_GROUP_ID, MESH_CHANNEL_INDEX)]
+
+    #YAML is a superset of JSON, so either works
+    with open(BRIDGE_ROUTES_FILE, encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+
+    routes = []
+    for i, entry in enumerate(config.get("routes") or [], 1):
+        if "group" not in entry or "channel" not in entry:
+            raise ValueError(f"{BRIDGE_ROUTES_FILE}: route {i} needs a group and a channel")
+        routes.append(make_route(
+            entry.get("name", f"route{i}"),
+            entry["group"],
+            entry["channel"],
+            direction=entry.get("direction", "both"),
+            mode=entry.get("mode"),
+            filter_chars=entry.get("filter"),
+        ))
+    if not routes:
+        raise ValueError(f"{BRIDGE_ROUTES_FILE}: no routes defined")
+    return routes
+
+
+try:
+    ROUTES = load_routes()
+except (OSError, ValueError, yaml.YAMLError) as e:
+    log.error("Routing table %s unusable: %s", BRIDGE_ROUTES_FILE, e)
+    raise SystemExit(1)
+ROUTES_BY_GROUP = {}
+ROUTES_BY_CHANNEL = {}
+for _route in ROUTES:
+    ROUTES_BY_GROUP.setdefault(_route["group"], []).append(_route)
+    ROUTES_BY_CHANNEL.setdefault(_route["channel"], []).append(_route)
+
+
+def routes_mode(routes):
+    #the most restrictive mode among routes sharing a channel decides which commands it gets
+    return max(route["mode"] for route in routes)
+
+
+def set_routes_mode(routes, mode):
+    for route in routes:
+        route["mode"] = mode
+
 # -------------------------
 # Bridge start time (used to discard old Signal messages)
 # -------------------------
 
 BRIDGE_START_TIME = int(time.time() * 1000)
 
+# -------------------------
+# Metrics
+# -------------------------
+#hot paths only bump a dict entry under one uncontended lock; gauges are
+#callables evaluated when /metrics is scraped
+
+METRIC_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+METRIC_HELP = {
+    "bridge_mesh_tx_queue_depth": "Messages waiting in MESH_TX_QUEUE",
+    "bridge_mesh_tx_queue_oldest_seconds": "Age of the oldest message in MESH_TX_QUEUE",
+    "bridge_mesh_tx_shed_total": "Messages dropped from MESH_TX_QUEUE, by reason",
+    "bridge_mesh_tx_total": "Mesh packets sent, by result and radio",
+    "bridge_mesh_tx_seconds": "Time spent in sendText",
+    "bridge_mesh_airtime_seconds_total": "Estimated LoRa airtime used by bridge transmissions, by radio",
+    "bridge_mesh_radio_up": "1 while a radio's link is up, 0 while it is reconnecting",
+    "bridge_mesh_link_lost_total": "Serial link losses detected, by radio",
+    "bridge_mesh_packets_total": "Mesh text packets received, by channel and hop count",
+    "bridge_mesh_known_nodes": "Distinct nodes in the node databases of the connected radios",
+    "bridge_mesh_ingress_total": "Mesh messages accepted or shed by the ingress shield",
+    "bridge_mesh_ack_total": "Mesh delivery tracking outcomes; nak and timeout are failed deliveries",
+    "bridge_mesh_ack_seconds": "Time from sending a mesh packet to its delivery ack",
+    "bridge_signal_rpc_seconds": "signal-cli JSON-RPC request latency, by method",
+    "bridge_signal_rpc_errors_total": "Failed signal-cli JSON-RPC calls, by method",
+    "bridge_signal_tx_queue_depth": "Calls waiting for the Signal send workers",
+    "bridge_signal_envelopes_total": "Signal envelopes received, by what the bridge did with them",
+    "bridge_startup_seconds": "Time spent in each startup phase",
+    "bridge_dedupe_hits_total": "Duplicate mesh packets / Signal envelopes dropped",
+    "bridge_dedupe_entries": "Keys held in each duplicate suppression cache",
+    "bridge_sender_cache_total": "Sender authorization lookups answered from cache (hit) or worked out (miss)",
+}
+
+_metrics_lock = threading.Lock()
+_metric_counters = {}
+_metric_histograms = {}
+_metric_gauges = {}
+
+def _metric_key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def metric_inc(name, value=1, **labels):
+    key = _metric_key(name, labels)
+    with _metrics_lock:
+        _metric_counters[key] = _metric_counters.get(key, 0) + value
+
+
+def metric_observe(name, value, **labels):
+    key = _metric_key(name, labels)
+    with _metrics_lock:
+        hist = _metric_histograms.get(key)
+        if hist is None:
+            hist = _metric_histograms[key] = [0] * len(METRIC_BUCKETS) + [0, 0.0]
+        for i, bound in enumerate(METRIC_BUCKETS):
+            if value <= bound:
+                hist[i] += 1
+        hist[-2] += 1
+        hist[-1] += value
+
+
+def metric_gauge(name, fn, **labels):
+    #fn() is called at scrape time; it may return a number or a {label value: number} dict
+    #for the single label named in `by`
+    _metric_gauges[_metric_key(name, labels)] = fn
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def render_metrics():
+    with _metrics_lock:
+        counters = dict(_metric_counters)
+        histograms = {k: list(v) for k, v in _metric_histograms.items()}
+
+    samples = {}
+    for (name, labels), value in counters.items():
+        samples.setdefault(name, ("counter", []))[1].append(f"{name}{_format_labels(labels)} {value:g}")
+
+    for (name, labels), fn in list(_metric_gauges.items()):
+        try:
+            value = fn()
+        except Exception:
+            continue
+        kind = "counter" if name.endswith("_total") else "gauge"
+        lines = samples.setdefault(name, (kind, []))[1]
+        if isinstance(value, dict):
+            label_name = dict(labels).pop("by", "reason")
+            base = tuple(item for item in labels if item[0] != "by")
+            for label_value, v in value.items():
+                lines.append(f"{name}{_format_labels(base, ((label_name, label_value),))} {v:g}")
+        else:
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+    for (name, labels), hist in histograms.items():
+        lines = samples.setdefault(name, ("histogram", []))[1]
+        for bound, count in zip(METRIC_BUCKETS, hist):
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', f'{bound:g}'),))} {count}")
+        lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {hist[-2]}")
+        lines.append(f"{name}_count{_format_labels(labels)} {hist[-2]}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {hist[-1]:g}")
+
+    out = []
+    for name in sorted(samples):
+        kind, lines = samples[name]
+        if name in METRIC_HELP:
+            out.append(f"# HELP {name} {METRIC_HELP[name]}")
+        out.append(f"# TYPE {name} {kind}")
+        out.extend(lines)
+    return "\n".join(out) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            self._reply(200, render_metrics(), "text/plain; version=0.0.4; charset=utf-8")
+        elif path == "/ready":
+            if BRIDGE_READY.is_set():
+                self._reply(200, "ready\n")
+            else:
+                self._reply(503, "starting\n")
+        else:
+            self.send_error(404)
+
+    def _reply(self, status, text, content_type="text/plain; charset=utf-8"):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug("metrics: " + format, *args)
+
+
+def start_metrics_server():
+    if METRICS_PORT <= 0:
+        return
+    try:
+        server = ThreadingHTTPServer(("0.0.0.0", METRICS_PORT), MetricsHandler)
+    except OSError as e:
+        log.error("Metrics endpoint failed to start on port %s: %s", METRICS_PORT, e)
+        return
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    log.info("Metrics: http://0.0.0.0:%s/metrics (readiness: /ready)", METRICS_PORT)
+
+# -------------------------
+# LoRa airtime scheduling
+# -------------------------
+
+#(spreading factor, bandwidth kHz, coding rate 4/x) in ModemPreset enum order
+LORA_PRESETS = (
+    ("LONG_FAST", 11, 250, 5),
+    ("LONG_SLOW", 12, 125, 8),
+    ("VERY_LONG_SLOW", 12, 62.5, 8),
+    ("MEDIUM_SLOW", 10, 250, 5),
+    ("MEDIUM_FAST", 9, 250, 5),
+    ("SHORT_SLOW", 8, 250, 5),
+    ("SHORT_FAST", 7, 250, 5),
+    ("LONG_MODERATE", 11, 125, 8),
+    ("SHORT_TURBO", 7, 500, 5),
+    ("LONG_TURBO", 11, 500, 8),
+)
+
+#firmware rounds these custom bandwidth settings to the real filter widths
+LORA_BANDWIDTHS = {31: 31.25, 62: 62.5, 200: 203.125, 400: 406.25, 800: 812.5, 1600: 1625}
+
+LORA_PREAMBLE_SYMBOLS = 16
+
+#16 byte mesh header plus the Data protobuf around the text
+MESH_PACKET_OVERHEAD = 22
+
+
+def read_lora_config(iface):
+    name, sf, bw, cr = LORA_PRESETS[0]
+    try:
+        lora = iface.localNode.localConfig.lora
+        if lora.use_preset:
+            if 0 <= lora.modem_preset < len(LORA_PRESETS):
+                name, sf, bw, cr = LORA_PRESETS[lora.modem_preset]
+        elif lora.spread_factor and lora.bandwidth:
+            name = "CUSTOM"
+            sf = lora.spread_factor
+            bw = LORA_BANDWIDTHS.get(lora.bandwidth, lora.bandwidth)
+            cr = lora.coding_rate or 5
+    except Exception as e:
+        log.warning("Could not read LoRa config, assuming %s: %s", name, e)
+    return name, sf, bw, cr
+
+
+def lora_time_on_air(payload_bytes, sf, bw_khz, cr):
+    #Semtech SX127x time-on-air: explicit header, CRC on
+    t_sym = (2 ** sf) / (bw_khz * 1000)
+    low_dr = 1 if t_sym > 0.016 else 0
+    t_preamble = (LORA_PREAMBLE_SYMBOLS + 4.25) * t_sym
+    bits = 8 * payload_bytes - 4 * sf + 28 + 16
+    payload_symbols = 8 + max(math.ceil(bits / (4 * (sf - 2 * low_dr))) * cr, 0)
+    return t_preamble + payload_symbols * t_sym
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        self._refill()
+        if self.tokens >= amount or self.rate <= 0:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount=1.0):
+        self._refill()
+        if self.tokens < amount:
+            return False
+        self.tokens -= amount
+        return True
+
+    def consume(self, amount):
+        #may go negative; a packet bigger than the bucket still has to be paid for
+        self._refill()
+        self.tokens -= amount
+
+
+class AirtimeScheduler:
+    #seconds of airtime the duty cycle budget can save up
+    BUDGET_WINDOW = 120
+
+    def __init__(self, iface, node_id=None):
+        self.iface = iface
+        self.node_id = node_id
+        self.preset, self.sf, self.bw, self.cr = read_lora_config(iface)
+        rate = MESH_DUTY_CYCLE / 100
+        self.budget = TokenBucket(rate, rate * self.BUDGET_WINDOW) if rate > 0 else None
+        self.next_tx = 0.0
+        self.airtime_total = 0.0
+
+    def describe(self):
+        return f"{self.preset} SF{self.sf} BW{self.bw:g} CR4/{self.cr}"
+
+    def time_on_air(self, payload_bytes):
+        return lora_time_on_air(payload_bytes + MESH_PACKET_OVERHEAD, self.sf, self.bw, self.cr)
+
+    def utilization_backoff(self):
+        #the bridge node reports channelUtilization/airUtilTx (percent) in its own deviceMetrics
+        try:
+            metrics = self.iface.nodes.get(self.node_id, {}).get("deviceMetrics", {})
+            chutil = float(metrics.get("channelUtilization") or 0)
+            airtx = float(metrics.get("airUtilTx") or 0)
+        except Exception:
+            return 1.0
+
+        factor = 1.0
+        if MESH_CHUTIL_TARGET > 0 and chutil > MESH_CHUTIL_TARGET:
+            #each 10 points over target adds another gap
+            factor += (chutil - MESH_CHUTIL_TARGET) / 10
+        if MESH_DUTY_CYCLE > 0 and airtx > MESH_DUTY_CYCLE:
+            factor += (airtx - MESH_DUTY_CYCLE) / MESH_DUTY_CYCLE
+        return factor
+
+    async def wait_for_slot(self, payload_bytes):
+        toa = self.time_on_air(payload_bytes)
+        delay = max(0.0, self.next_tx - time.monotonic())
+        if self.budget:
+            delay = max(delay, self.budget.wait_time(toa))
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return toa
+
+    def record_send(self, payload_bytes):
+        toa = self.time_on_air(payload_bytes)
+        if self.budget:
+            self.budget.consume(toa)
+        self.airtime_total += toa
+
+        gap = max(MESH_TX_MIN_GAP, toa * MESH_TX_SPACING) * self.utilization_backoff()
+        self.next_tx = time.monotonic() + gap
+        log.debug("Mesh TX %sB: %.2fs on air, next slot in %.2fs", payload_bytes, toa, gap)
+
+    def ready_in(self):
+        return max(0.0, self.next_tx - time.monotonic())
+
 # -------------------------
 # Signal to Mesh message queueing
 # -------------------------
 
-MESH_TX_QUEUE = queue.Queue()
+#traffic classes, most urgent first
+MESH_PRIORITY = {"alert": 0, "relay": 1, "reply": 2}
+
+MESH_TTL = {"alert": MESH_TTL_ALERT, "relay": MESH_TTL_RELAY, "reply": MESH_TTL_REPLY}
+
+
+def _preview(text, width=40):
+    text = text.replace("\n", " ")
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+
+class MeshTxQueue:
+    #priority queue: alerts before relays before replies, FIFO within a class;
+    #expired items are dropped on the way out, duplicates and overflow on the way in.
+    #A reply identical to one still queued for another node widens that one to a channel
+    #broadcast instead, so ten nodes asking the same thing cost one packet.
+    #Filled and drained on the bridge loop; the lock only guards reads from the metrics thread
+
+    def __init__(self, max_depth, drop_policy):
+        self.max_depth = max_depth
+        self.drop_policy = drop_policy
+        self._heap = []
+        self._seq = itertools.count()
+        self._pending = {}
+        #(channel, message) -> the queued reply with that text
+        self._replies = {}
+        self._lock = threading.Lock()
+        self._changed = asyncio.Event()
+        self.shed = {"expired": 0, "duplicate": 0, "overflow": 0}
+        self.journal = None
+
+    @staticmethod
+    def _key(item):
+        return item["channel"], item.get("dest"), item["message"]
+
+    def _shed(self, item, reason):
+        self.shed[reason] += 1
+        if reason != "duplicate":
+            self.done(item)
+        else:
+            ha_release(item.pop("ha_keys", None))
+        log.log(
+            logging.INFO if reason == "duplicate" else logging.WARNING,
+            "Mesh TX queue: dropped %s %s (%s): %s",
+            reason, item["kind"], item.get("sender_label") or "bridge", _preview(item["message"])
+        )
+
+    def _remove(self, entry):
+        self._heap.remove(entry)
+        heapq.heapify(self._heap)
+        self._forget(entry[2])
+
+    def _remember(self, item):
+        key = self._key(item)
+        self._pending[key] = self._pending.get(key, 0) + 1
+        if item["kind"] == "reply":
+            self._replies[item["channel"], item["message"]] = item
+
+    def _forget(self, item):
+        key = self._key(item)
+        self._pending[key] -= 1
+        if not self._pending[key]:
+            del self._pending[key]
+        if self._replies.get((item["channel"], item["message"])) is item:
+            del self._replies[item["channel"], item["message"]]
+
+    def _rekey(self, item, **changes):
+        #changes a queued item in place; it keeps its place in line
+        self._forget(item)
+        item.update(changes)
+        self._remember(item)
+        if self.journal:
+            self.journal.add(item)
+
+    def _pick_victim(self, incoming):
+        if self.drop_policy == "oldest":
+            return min(self._heap, key=lambda entry: entry[2]["enqueued"])
+        #lowest priority, oldest within it; the newcomer loses if it ranks below everything queued
+        worst = max(self._heap, key=lambda entry: (entry[0], -entry[1]))
+        if MESH_PRIORITY[incoming["kind"]] > worst[0]:
+            return None
+        return worst
+
+    def put(self, item):
+        now = time.time()
+        item.setdefault("enqueued", now)
+        #journal entries from before routing tables carry no channel
+        item.setdefault("channel", MESH_CHANNEL_INDEX)
+        ttl = MESH_TTL[item["kind"]]
+        item["expires"] = item["enqueued"] + ttl if ttl > 0 else None
+
+        with self._lock:
+            if self._key(item) in self._pending:
+                self._shed(item, "duplicate")
+                return False
+
+            queued = self._replies.get((item["channel"], item["message"])) if item["kind"] == "reply" else None
+            if queued is not None:
+                #same reply, another node: send it once, to everyone
+                ha_keys = (queued.get("ha_keys") or []) + (item.pop("ha_keys", None) or [])
+                self._rekey(
+                    queued, dest=None, via=queued.get("via") if queued.get("via") == item.get("via") else None,
+                    ha_keys=ha_keys or None
+                )
+                self._shed(item, "duplicate")
+                return False
+
+            if len(self._heap) >= self.max_depth:
+                victim = self._pick_victim(item)
+                if victim is None:
+                    self._shed(item, "overflow")
+                    return False
+                self._remove(victim)
+                self._shed(victim[2], "overflow")
+
+            self._push(item)
+            if self.journal:
+                self.journal.add(item)
+            return True
+
+    def done(self, item):
+        #item has left the bridge for good (sent or dropped)
+        if self.journal:
+            self.journal.remove(item)
+        ha_release(item.pop("ha_keys", None))
+
+    def drop_held(self):
+        #HA demotion: unsent items a claim is waiting on are the new leader's to send now
+        with self._lock:
+            held = [entry for entry in self._heap if entry[2].get("ha_keys")]
+            for entry in held:
+                self._remove(entry)
+                if self.journal:
+                    self.journal.remove(entry[2])
+        return len(held)
+
+    def requeue(self, item):
+        #an item a radio failed to send goes back in its old place in line
+        with self._lock:
+            self._push(item, item.get("seq"))
+
+    def notify(self):
+        #wakes every waiting get() so it looks again, e.g. after a radio went down or came back
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _push(self, item, seq=None):
+        item["seq"] = next(self._seq) if seq is None else seq
+        heapq.heappush(self._heap, (MESH_PRIORITY[item["kind"]], item["seq"], item))
+        self._remember(item)
+        self.notify()
+
+    def amend(self, channel, tag, update):
+        #update(item) -> changes for the queued, unsent item tagged `tag` on `channel`; False if there is none
+        with self._lock:
+            for entry in self._heap:
+                item = entry[2]
+                if item.get("tag") == tag and item["channel"] == channel:
+                    self._rekey(item, **update(item))
+                    self.notify()
+                    return True
+            return False
+
+    def _pop(self, match, accept):
+        #(item, blocked): blocked when the next item in line does not satisfy match;
+        #items accept() turns down are left for another taker
+        with self._lock:
+            self._expire()
+            entries = self._heap if accept is None else sorted(self._heap)
+            for entry in entries:
+                item = entry[2]
+                if accept is not None and not accept(item):
+                    continue
+                if match is not None and not match(item):
+                    return None, True
+                if entry is self._heap[0]:
+                    heapq.heappop(self._heap)
+                else:
+                    self._heap.remove(entry)
+                    heapq.heapify(self._heap)
+                self._forget(item)
+                return item, False
+            return None, False
+
+    def _expire(self):
+        now = time.time()
+        expired = [entry for entry in self._heap if entry[2]["expires"] is not None and now > entry[2]["expires"]]
+        for entry in expired:
+            self._remove(entry)
+            self._shed(entry[2], "expired")
+
+    async def get(self, timeout=None, match=None, accept=None):
+        #waits until an item is available; returns None on timeout,
+        #or straight away if the next item in line does not satisfy match
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            changed = self._changed
+            item, blocked = self._pop(match, accept)
+            if item is not None or blocked:
+                return item
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    def qsize(self):
+        with self._lock:
+            return len(self._heap)
+
+    def oldest_age(self):
+        with self._lock:
+            if not self._heap:
+                return 0.0
+            return time.time() - min(entry[2]["enqueued"] for entry in self._heap)
+
+
+MESH_TX_QUEUE = MeshTxQueue(MESH_TX_MAX_DEPTH, MESH_TX_DROP_POLICY)
 
-def mesh_tx_worker(iface):
-    while True:
-        message, sender_label, log_relay = MESH_TX_QUEUE.get()
+# -------------------------
+# Durable mesh TX journal
+# -------------------------
+#SQLite in WAL mode under BRIDGE_DATA_DIR; callers only append to an in-memory list,
+#a flusher thread commits everything pending in one transaction every MESH_TX_PERSIST_FLUSH_MS.
+#The Signal outbox keeps its own journal the same way (table signal_tx)
+
+class TxJournal:
+    def __init__(self, path, table="mesh_tx"):
+        self.path = path
+        self.table = table
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        #NORMAL in WAL mode: commits survive a process crash or container restart, fsync happens at checkpoints
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY, enqueued REAL, item TEXT)"
+        )
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def add(self, item):
+        record = {k: v for k, v in item.items() if k not in ("seq", "expires")}
+        with self._lock:
+            self._pending.append(("add", item["id"], item["enqueued"], json.dumps(record)))
+        self._wake.set()
+
+    def remove(self, item):
+        with self._lock:
+            self._pending.append(("remove", item["id"], None, None))
+        self._wake.set()
+
+    def load(self):
+        rows = self._db.execute(f"SELECT item FROM {self.table} ORDER BY enqueued").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
 
         try:
-            iface.sendText(message, channelIndex=MESH_CHANNEL_INDEX)
+            self._db.execute("BEGIN")
+            for op, item_id, enqueued, record in batch:
+                if op == "add":
+                    self._db.execute(
+                        f"INSERT OR REPLACE INTO {self.table} (id, enqueued, item) VALUES (?, ?, ?)",
+                        (item_id, enqueued, record)
+                    )
+                else:
+                    self._db.execute(f"DELETE FROM {self.table} WHERE id = ?", (item_id,))
+            self._db.execute("COMMIT")
+        except sqlite3.Error as e:
+            log.error("TX journal %s write failed: %s", self.path, e)
+            try:
+                self._db.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+
+    def run(self):
+        while True:
+            self._wake.wait()
+            #let the rest of a burst pile up so it shares one commit
+            time.sleep(MESH_TX_PERSIST_FLUSH_MS / 1000)
+            self._wake.clear()
+            self.flush()
+
+
+def start_mesh_tx_journal():
+    if not MESH_TX_PERSIST:
+        return
 
-            if log_relay:
-                if sender_label:
-                    log.info(f"Relayed Signal → Mesh ({sender_label})")
+    try:
+        os.makedirs(BRIDGE_DATA_DIR, exist_ok=True)
+        journal = TxJournal(os.path.join(BRIDGE_DATA_DIR, "mesh_tx.db"))
+        saved = journal.load()
+    except (OSError, sqlite3.Error) as e:
+        log.error("Mesh TX journal unavailable, queue is memory-only: %s", e)
+        return
+
+    MESH_TX_QUEUE.journal = journal
+    threading.Thread(target=journal.run, name="mesh-tx-journal", daemon=True).start()
+
+    now = time.time()
+    replayed = 0
+    for item in saved:
+        ttl = MESH_TTL.get(item.get("kind"), 0)
+        if ttl > 0 and now - item["enqueued"] > ttl:
+            journal.remove(item)
+            continue
+        if MESH_TX_QUEUE.put(item):
+            replayed += 1
+        else:
+            journal.remove(item)
+
+    log.info(
+        "Mesh TX journal: %s (%s saved, %s replayed)",
+        journal.path, len(saved), replayed
+    )
+
+# -------------------------
+# Mesh radios
+# -------------------------
+#one MeshRadio per MESH_DEVICES entry, each with its own airtime scheduler and TX worker.
+#All workers drain the one MESH_TX_QUEUE; radio_accepts() decides which radio may take an item
+
+class MeshRadio:
+    def __init__(self, path):
+        self.path = path
+        self.iface = None
+        self.node_id = None
+        self.scheduler = None
+        #last time the link was known to work: a packet in, a send or a heartbeat
+        self.last_ok = 0.0
+        self._lost = asyncio.Event()
+
+    def healthy(self):
+        return self.iface is not None and not self._lost.is_set()
+
+    def ready_in(self):
+        return self.scheduler.ready_in() if self.scheduler else 0.0
+
+    def link_lost(self, reason):
+        #sending stops here; radio_supervisor() reconnects
+        if self._lost.is_set():
+            return
+        self._lost.set()
+        log.error("Mesh radio %s link lost (%s); holding its traffic while it reconnects", self.path, reason)
+        metric_inc("bridge_mesh_link_lost_total", device=self.path)
+        #items held for this radio may go to the others now
+        MESH_TX_QUEUE.notify()
+
+    def mark_ok(self):
+        self.last_ok = time.monotonic()
+
+
+MESH_RADIOS = [MeshRadio(path) for path in MESH_DEVICES]
+MESH_RADIOS_BY_PATH = {radio.path: radio for radio in MESH_RADIOS}
+
+#our own node ids, one per connected radio
+BRIDGE_NODE_IDS = set()
+
+#set once any radio is connected
+MESH_RADIO_UP = asyncio.Event()
+
+#round_robin: index into MESH_RADIOS of the radio whose turn it is
+_mesh_turn = 0
+
+def _healthy_radio(path):
+    radio = MESH_RADIOS_BY_PATH.get(path)
+    return radio if radio is not None and radio.healthy() else None
+
+
+def radio_accepts(radio, item):
+    #a standby keeps its radios connected but sends nothing
+    if not radio.healthy() or not HA_LEADER:
+        return False
+
+    #a command reply goes out on the radio that heard the command, if it still can
+    via = _healthy_radio(item.get("via"))
+    if via is not None:
+        return via is radio
+
+    pinned = _healthy_radio(MESH_TX_PINS.get(item["channel"]))
+    if pinned is not None:
+        return pinned is radio
+
+    if MESH_TX_POLICY == "round_robin":
+        turn = MESH_RADIOS[_mesh_turn]
+        return turn is radio or not turn.healthy()
+    return True
+
+
+def radio_taken(radio):
+    #passes the turn on to the next radio that is up
+    global _mesh_turn
+    if MESH_TX_POLICY != "round_robin":
+        return
+    index = MESH_RADIOS.index(radio)
+    for step in range(1, len(MESH_RADIOS) + 1):
+        candidate = (index + step) % len(MESH_RADIOS)
+        if MESH_RADIOS[candidate].healthy():
+            _mesh_turn = candidate
+            break
+    MESH_TX_QUEUE.notify()
+
+
+async def connect_radio(radio):
+    log.info("Connecting to Meshtastic on %s...", radio.path)
+    try:
+        #returns once the radio has sent its config and node list
+        iface = await asyncio.to_thread(SerialInterface, devPath=radio.path)
+    except Exception as e:
+        log.error("Could not connect to Meshtastic on %s: %s", radio.path, e)
+        return False
+
+    try:
+        info = iface.myInfo
+        my_node_num = info.get("myNodeNum") if isinstance(info, dict) else getattr(info, "my_node_num", None)
+    except Exception:
+        my_node_num = None
+    if my_node_num is not None:
+        radio.node_id = f"!{my_node_num:08x}"
+        BRIDGE_NODE_IDS.add(radio.node_id)
+        log.info("Bridge node ID on %s: %s", radio.path, radio.node_id)
+
+    #a reconnect may find a different modem preset; airtime spent and the pending gap carry over
+    previous = radio.scheduler
+    radio.scheduler = AirtimeScheduler(iface, radio.node_id)
+    if previous is not None:
+        radio.scheduler.airtime_total = previous.airtime_total
+        radio.scheduler.next_tx = previous.next_tx
+    log.info(
+        "LoRa airtime on %s: %s, 200B packet ≈ %.2fs on air",
+        radio.path, radio.scheduler.describe(), radio.scheduler.time_on_air(200)
+    )
+    seed_node_index(iface)
+    subscribe_mesh_handlers()
+
+    radio.iface = iface
+    radio.mark_ok()
+    radio._lost.clear()
+    MESH_RADIO_UP.set()
+    MESH_TX_QUEUE.notify()
+    return True
+
+
+async def _close_interface(iface):
+    #best effort: a radio that vanished mid-write can leave close() stuck on the port
+    try:
+        await asyncio.wait_for(asyncio.to_thread(iface.close), MESH_RADIO_TIMEOUT)
+    except Exception as e:
+        log.debug("Closing dead interface: %s", e)
+
+
+async def radio_supervisor(radio):
+    #one per radio: waits for link loss, drops the dead interface and reconnects with backoff
+    while True:
+        await radio._lost.wait()
+        lost_at = time.monotonic()
+        iface, radio.iface = radio.iface, None
+        if iface is not None:
+            await _close_interface(iface)
+
+        delay = 1
+        while not await connect_radio(radio):
+            log.info("Mesh radio %s: next reconnect attempt in %ss", radio.path, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MESH_RADIO_RETRY)
+        log.info("Mesh radio %s reconnected after %.1fs", radio.path, time.monotonic() - lost_at)
+
+
+async def radio_heartbeat(radio):
+    #an idle link can die unnoticed until the next send; a heartbeat is a serial write, no airtime
+    while True:
+        await asyncio.sleep(MESH_HEARTBEAT_INTERVAL / 4)
+        iface = radio.iface
+        if not radio.healthy() or time.monotonic() - radio.last_ok < MESH_HEARTBEAT_INTERVAL:
+            continue
+        try:
+            await asyncio.wait_for(asyncio.to_thread(iface.sendHeartbeat), MESH_RADIO_TIMEOUT)
+        except Exception as e:
+            if radio.iface is iface:
+                radio.link_lost(f"heartbeat failed: {str(e) or type(e).__name__}")
+            continue
+        radio.mark_ok()
+
+
+def on_connection_lost(interface):
+    #meshtastic's reader thread, when the serial port goes away
+    on_loop(_connection_lost, interface)
+
+
+def _connection_lost(interface):
+    radio = radio_for_interface(interface)
+    if radio is not None:
+        radio.link_lost("connection lost")
+
+
+#(listener, topic) for every pubsub handler the bridge relies on
+MESH_SUBSCRIPTIONS = []
+
+def mesh_subscribe(listener, topic):
+    MESH_SUBSCRIPTIONS.append((listener, topic))
+    pub.subscribe(listener, topic)
+
+
+def subscribe_mesh_handlers():
+    #after a (re)connect: pubsub listeners are per topic, not per interface, so they normally
+    #survive; put back any that did not so the new interface is heard
+    for listener, topic in MESH_SUBSCRIPTIONS:
+        if not pub.isSubscribed(listener, topic):
+            log.warning("Re-subscribing %s to %s", listener.__name__, topic)
+            pub.subscribe(listener, topic)
+
+
+def start_radio_supervision():
+    mesh_subscribe(on_connection_lost, "meshtastic.connection.lost")
+    for radio in MESH_RADIOS:
+        if radio.iface is None:
+            radio._lost.set()
+        spawn(radio_supervisor(radio), name=f"mesh-link {radio.path}")
+        if MESH_HEARTBEAT_INTERVAL > 0:
+            spawn(radio_heartbeat(radio), name=f"mesh-heartbeat {radio.path}")
+
+
+def radio_for_interface(interface):
+    for radio in MESH_RADIOS:
+        if radio.iface is interface:
+            return radio
+    return None
+
+def known_mesh_nodes():
+    #metrics thread; the node databases change under us, so each is copied before it is read
+    nodes = set()
+    for radio in MESH_RADIOS:
+        iface = radio.iface
+        if iface is not None and radio.healthy():
+            nodes.update(list((getattr(iface, "nodes", None) or {}).copy()))
+    return len(nodes)
+
+async def coalesce_relays(first, radio, accept):
+    #pack the relays queued behind `first` into one packet, one "[sender] text" per line;
+    #keeps collecting until the hold window closes or the radio is free, whichever is later
+    batch = [first]
+    size = len(first["message"].encode("utf-8"))
+    deadline = time.monotonic() + max(MESH_COALESCE_WINDOW, radio.scheduler.ready_in())
+
+    def fits(item):
+        #message boundary: anything that won't fit whole stays queued for the next packet
+        return (
+            item["kind"] == "relay"
+            and item["channel"] == first["channel"]
+            and item.get("dest") == first.get("dest")
+            and len(item["parts"]) == 1
+            and size + 1 + len(item["message"].encode("utf-8")) <= MESH_MAX_PAYLOAD
+        )
+
+    while size < MESH_MAX_PAYLOAD:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        nxt = await MESH_TX_QUEUE.get(timeout=remaining, match=fits, accept=accept)
+        if nxt is None:
+            break
+
+        batch.append(nxt)
+        size += 1 + len(nxt["message"].encode("utf-8"))
+
+    if len(batch) == 1:
+        return first, batch
+
+    log.debug("Coalesced %s Signal relays into one %sB packet", len(batch), size)
+    message = "\n".join(item["message"] for item in batch)
+    #the claims it carries are released through the batch
+    packed = dict(first, message=message, parts=[message], ha_keys=None)
+    return packed, batch
+
+
+async def mesh_tx_worker(radio):
+    def accept(item):
+        return radio_accepts(radio, item)
+
+    while True:
+        #a radio only takes work once it could send it, so the packet goes to whichever radio is free first
+        wait = radio.ready_in()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        item = await MESH_TX_QUEUE.get(accept=accept)
+        radio_taken(radio)
+        #a reconnect swaps both; this item is sent through the pair it was taken for
+        iface, scheduler = radio.iface, radio.scheduler
+        batch = [item]
+
+        if MESH_COALESCE_WINDOW > 0 and item["kind"] == "relay" and len(item["parts"]) == 1:
+            item, batch = await coalesce_relays(item, radio, accept)
+
+        sent_parts = 0
+        try:
+            #segments of one message go out back to back; nothing else is dequeued in between
+            for part in item["parts"]:
+                payload_bytes = len(part.encode("utf-8"))
+                await scheduler.wait_for_slot(payload_bytes)
+                want_ack = wants_mesh_ack(item)
+                started = time.monotonic()
+                try:
+                    #serial write; off the loop so Signal traffic keeps flowing meanwhile.
+                    #a write that hangs is abandoned, not cancelled: the thread may still finish it
+                    packet = await asyncio.wait_for(
+                        asyncio.to_thread(
+                            iface.sendText,
+                            part,
+                            destinationId=item.get("dest") or "^all",
+                            channelIndex=item["channel"],
+                            wantAck=want_ack,
+                        ),
+                        MESH_RADIO_TIMEOUT,
+                    )
+                except Exception:
+                    metric_inc("bridge_mesh_tx_total", result="error", device=radio.path)
+                    raise
+                metric_observe("bridge_mesh_tx_seconds", time.monotonic() - started)
+                metric_inc("bridge_mesh_tx_total", result="ok", device=radio.path)
+                scheduler.record_send(payload_bytes)
+                sent_parts += 1
+                if want_ack:
+                    track_mesh_ack(packet, item, part, iface)
+            radio.mark_ok()
+
+            for sent in batch:
+                MESH_TX_QUEUE.done(sent)
+                if not sent["log_relay"]:
+                    continue
+                if sent["sender_label"]:
+                    log.info(f"Relayed Signal → Mesh ({sent['sender_label']})")
                 else:
                     log.info("Relayed Signal → Mesh")
 
         except Exception as e:
-            log.error("Mesh send failed — interface may be down: %s", e)
+            if radio.iface is iface:
+                radio.link_lost(e if str(e) else type(e).__name__)
+            #whatever this radio didn't get out goes back in line, for another radio or for this one once it is back
+            if sent_parts:
+                MESH_TX_QUEUE.requeue(dict(item, parts=item["parts"][sent_parts:], via=None))
+            else:
+                for unsent in batch:
+                    MESH_TX_QUEUE.requeue(dict(unsent, via=None))
+
+
+# -------------------------
+# Mesh delivery acknowledgements
+# -------------------------
+#packets sent with wantAck get a ROUTING_APP reply from our radio: errorReason NONE once a
+#neighbour is heard rebroadcasting it (implicit ack), or a NAK such as MAX_RETRANSMIT.
+#direct messages are confirmed by the node they were addressed to
+
+MESH_PENDING_ACKS = {}
+MESH_RETRIES = []
+MESH_ACK_LOCK = threading.Lock()
+MESH_ACK_STATS = {"tracked": 0, "acked": 0, "nak": 0, "timeout": 0, "retried": 0, "given_up": 0, "fallback": 0}
 
-        time.sleep(3.2)
-        MESH_TX_QUEUE.task_done()
+#recent delivery latencies, seconds
+MESH_ACK_LATENCIES = collections.deque(maxlen=200)
+
+MESH_ACK_REPORT_INTERVAL = 900
+
+def wants_mesh_ack(item):
+    if item.get("dest"):
+        #the ack is what tells us to fall back to a broadcast
+        return MESH_REPLY_FALLBACK
+    return MESH_WANT_ACK and item["kind"] != "reply"
+
+
+def track_mesh_ack(packet, item, part, iface):
+    packet_id = getattr(packet, "id", None)
+    if not packet_id:
+        return
+    with MESH_ACK_LOCK:
+        MESH_PENDING_ACKS[packet_id] = {
+            "item": item,
+            "part": part,
+            "iface": iface,
+            "sent": time.monotonic(),
+        }
+        MESH_ACK_STATS["tracked"] += 1
+
+
+def _schedule_retry(entry, reason):
+    #called with MESH_ACK_LOCK held
+    item = entry["item"]
+    attempt = item.get("attempt", 0) + 1
+    label = item.get("sender_label") or "bridge"
+
+    if item.get("dest"):
+        #a direct reply that never reached its node goes out once more to the whole channel, right away
+        fallback = dict(item, id=uuid.uuid4().hex, message=entry["part"], parts=[entry["part"]], dest=None, via=None)
+        heapq.heappush(MESH_RETRIES, (time.monotonic(), fallback["id"], fallback))
+        MESH_ACK_STATS["fallback"] += 1
+        log.info("Direct reply to %s %s; broadcasting it instead", item["dest"], reason)
+        return
+
+    if attempt > MESH_ACK_RETRIES:
+        MESH_ACK_STATS["given_up"] += 1
+        log.warning("Mesh delivery unconfirmed (%s) after %s resends: %s", label, attempt - 1, _preview(entry["part"]))
+        return
+
+    delay = min(MESH_ACK_BACKOFF * (2 ** (attempt - 1)), MESH_ACK_BACKOFF_MAX)
+    #any radio may take the resend
+    retry = dict(item, id=uuid.uuid4().hex, message=entry["part"], parts=[entry["part"]], attempt=attempt, via=None)
+    heapq.heappush(MESH_RETRIES, (time.monotonic() + delay, retry["id"], retry))
+    MESH_ACK_STATS["retried"] += 1
+    log.info("Mesh delivery %s (%s); resend %s/%s in %ss", reason, label, attempt, MESH_ACK_RETRIES, delay)
+
+
+def on_mesh_routing(packet, interface):
+    #meshtastic's pubsub thread
+    on_loop(handle_mesh_routing, packet, interface)
+
+
+def handle_mesh_routing(packet, interface):
+    try:
+        decoded = packet.get("decoded") or {}
+        request_id = decoded.get("requestId")
+        if not request_id:
+            return
+        error = (decoded.get("routing") or {}).get("errorReason", "NONE")
+
+        with MESH_ACK_LOCK:
+            #only the radio that sent a packet can confirm it
+            entry = MESH_PENDING_ACKS.get(request_id)
+            if entry is None or entry["iface"] is not interface:
+                return
+            del MESH_PENDING_ACKS[request_id]
+
+            if error == "NONE":
+                latency = time.monotonic() - entry["sent"]
+                MESH_ACK_STATS["acked"] += 1
+                MESH_ACK_LATENCIES.append(latency)
+                metric_observe("bridge_mesh_ack_seconds", latency)
+                log.debug("Mesh delivery confirmed (%s) in %.1fs", entry["item"].get("sender_label") or "bridge", latency)
+            else:
+                MESH_ACK_STATS["nak"] += 1
+                _schedule_retry(entry, f"failed: {error}")
+    except Exception as e:
+        log.error("Error handling mesh routing packet: %s", e, exc_info=True)
+
+
+def mesh_ack_summary():
+    with MESH_ACK_LOCK:
+        stats = dict(MESH_ACK_STATS)
+        latencies = sorted(MESH_ACK_LATENCIES)
+    decided = stats["acked"] + stats["nak"] + stats["timeout"]
+    ratio = f"{100 * stats['acked'] / decided:.0f}%" if decided else "n/a"
+    median = f"{latencies[len(latencies) // 2]:.1f}s" if latencies else "n/a"
+    return (
+        f"ack ratio {ratio} ({stats['acked']}/{decided}), median latency {median}, "
+        f"resent {stats['retried']}, gave up {stats['given_up']}, replies broadcast {stats['fallback']}"
+    )
+
+
+async def mesh_ack_worker():
+    #expires unanswered packets and feeds due resends back through the TX queue (and so the scheduler)
+    last_report = time.monotonic()
+    while True:
+        await asyncio.sleep(1)
+        now = time.monotonic()
+
+        with MESH_ACK_LOCK:
+            for packet_id, entry in list(MESH_PENDING_ACKS.items()):
+                if now - entry["sent"] > MESH_ACK_TIMEOUT:
+                    del MESH_PENDING_ACKS[packet_id]
+                    MESH_ACK_STATS["timeout"] += 1
+                    _schedule_retry(entry, "timed out")
+
+            due = []
+            while MESH_RETRIES and MESH_RETRIES[0][0] <= now:
+                due.append(heapq.heappop(MESH_RETRIES)[2])
+
+        for retry in due:
+            MESH_TX_QUEUE.put(retry)
+
+        if now - last_report > MESH_ACK_REPORT_INTERVAL and MESH_ACK_STATS["tracked"]:
+            log.info("Mesh delivery: %s", mesh_ack_summary())
+            last_report = now
+
+
+def start_mesh_ack_tracking():
+    if not MESH_WANT_ACK and not (MESH_REPLY_MODE == "direct" and MESH_REPLY_FALLBACK):
+        return
+    mesh_subscribe(on_mesh_routing, "meshtastic.receive.routing")
+    spawn(mesh_ack_worker(), name="mesh-ack")
 
 
 # -------------------------
@@ -150,6 +1480,109 @@ def format_signal_to_mesh(sender_name, message_text):
     return f"[{sender_name}] {message_text}"
 
 
+def _extends_grapheme(prev, ch):
+    cp = ord(ch)
+    if prev.endswith("\u200d"):
+        return True
+    if 0x1F1E6 <= cp <= 0x1F1FF:
+        #regional indicators pair up into one flag
+        return len(prev) == 1 and 0x1F1E6 <= ord(prev) <= 0x1F1FF
+    return (
+        unicodedata.category(ch) in ("Mn", "Mc", "Me")
+        or cp == 0x200D
+        or 0xFE00 <= cp <= 0xFE0F
+        or 0x1F3FB <= cp <= 0x1F3FF
+        or 0xE0020 <= cp <= 0xE007F
+    )
+
+
+def split_graphemes(text):
+    #close enough to UAX #29 for names and chat text: keeps ZWJ sequences, skin tones,
+    #flags, keycaps, tag sequences and combining marks in one piece
+    clusters = []
+    for ch in text:
+        if clusters and _extends_grapheme(clusters[-1], ch):
+            clusters[-1] += ch
+        else:
+            clusters.append(ch)
+    return clusters
+
+
+def utf8_len(text):
+    return len(text.encode("utf-8"))
+
+
+def _chunk_text(text, budget):
+    #greedy fill on word boundaries; words longer than a whole chunk break between graphemes
+    chunks = []
+    current = ""
+
+    for token in re.findall(r"\S+|\s+", text):
+        if utf8_len(current) + utf8_len(token) <= budget:
+            current += token
+            continue
+
+        if token.isspace():
+            chunks.append(current)
+            current = ""
+            continue
+
+        if current.strip():
+            chunks.append(current)
+        current = ""
+
+        if utf8_len(token) <= budget:
+            current = token
+            continue
+
+        for cluster in split_graphemes(token):
+            if utf8_len(current) + utf8_len(cluster) > budget:
+                chunks.append(current)
+                current = ""
+            current += cluster
+
+    if current.strip():
+        chunks.append(current)
+
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+
+def _truncate_to(text, budget, marker="…"):
+    clusters = split_graphemes(text.rstrip())
+    while clusters and utf8_len("".join(clusters) + marker) > budget:
+        clusters.pop()
+    return "".join(clusters).rstrip() + marker
+
+
+def segment_signal_to_mesh(sender_name, message_text):
+    #every segment keeps the [sender] prefix and, when split, ends with a "(1/3)" marker;
+    #each one fits MESH_MAX_PAYLOAD bytes exactly as encoded
+    whole = format_signal_to_mesh(sender_name, message_text)
+    if utf8_len(whole) <= MESH_MAX_PAYLOAD:
+        return [whole]
+
+    prefix = format_signal_to_mesh(sender_name, "")
+    widest_marker = f" ({MESH_MAX_SEGMENTS}/{MESH_MAX_SEGMENTS})"
+    budget = MESH_MAX_PAYLOAD - utf8_len(prefix) - utf8_len(widest_marker)
+    if budget < 8:
+        return [_truncate_to(whole, MESH_MAX_PAYLOAD)]
+
+    chunks = _chunk_text(message_text, budget)
+    if len(chunks) > MESH_MAX_SEGMENTS:
+        log.info(
+            "Long Signal message from %s needs %s segments; sending the first %s",
+            sender_name, len(chunks), MESH_MAX_SEGMENTS
+        )
+        chunks = chunks[:MESH_MAX_SEGMENTS]
+        chunks[-1] = _truncate_to(chunks[-1], budget)
+
+    if len(chunks) == 1:
+        return [f"{prefix}{chunks[0]}"]
+
+    total = len(chunks)
+    return [f"{prefix}{chunk} ({i}/{total})" for i, chunk in enumerate(chunks, 1)]
+
+
 def format_mesh_to_signal(sender_name, message_text):
     return f"[{sender_name}] {message_text}"
 
@@ -157,71 +1590,756 @@ def format_mesh_to_signal(sender_name, message_text):
 def format_bridge_message(text):
     return f"[{BRIDGE_PREFIX}] {text}"
 
-def build_status_message():
-    relay_state = "ON" if RELAY_ENABLED else "OFF"
-    return format_bridge_message(
-        f"Message relaying is {relay_state}. MODE{RELAY_MODE} is active."
-    )
+def build_status_message(routes):
+    return _status_text(tuple((route["name"], route["enabled"], route["mode"]) for route in routes))
+
+
+@functools.lru_cache(maxsize=64)
+def _status_text(states):
+    #keyed on the route state it reports, so a cached reply is never stale
+    if len(states) == 1:
+        _, enabled, mode = states[0]
+        return format_bridge_message(f"Message relaying is {'ON' if enabled else 'OFF'}. MODE{mode} is active.")
+    listing = "; ".join(f"{name}: {'ON' if enabled else 'OFF'}, MODE{mode}" for name, enabled, mode in states)
+    return format_bridge_message(f"Message relaying: {listing}.")
+
+# -------------------------
+# Event loop
+# -------------------------
+#Signal I/O, mesh packet handling, commands and the mesh TX scheduler all run as tasks on
+#one asyncio loop in the main thread, so relay state only ever changes on that thread.
+#Other threads (meshtastic's pubsub thread, the metrics server) hand work in via on_loop()
+
+BRIDGE_LOOP = None
+
+def on_loop(fn, *args):
+    #schedule fn(*args) on the bridge loop; safe from any thread
+    BRIDGE_LOOP.call_soon_threadsafe(fn, *args)
+
+
+def _task_done(task):
+    if not task.cancelled() and task.exception() is not None:
+        log.error("Task %s failed: %s", task.get_name(), task.exception(), exc_info=task.exception())
+
+
+def spawn(coro, name=None):
+    #create_task, but a task that dies gets logged instead of vanishing
+    task = BRIDGE_LOOP.create_task(coro, name=name)
+    task.add_done_callback(_task_done)
+    return task
 
 # -------------------------
 # Signal RPC helpers
 # -------------------------
 
-_rpc_id = 0
+_rpc_ids = itertools.count(1)
+
+class HttpError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class AsyncHttpClient:
+    #just enough HTTP/1.1 for signal-cli's daemon: JSON POSTs over pooled keep-alive
+    #connections, and a streamed GET for its server-sent events. Plain http only: the daemon
+    #speaks no TLS, so an https:// URL means a proxy in front of it that this client can't talk to
+
+    def __init__(self, base_url):
+        parts = urllib.parse.urlsplit(base_url)
+        if parts.scheme != "http":
+            raise ValueError(f"{base_url}: only http:// URLs are supported, not {parts.scheme or 'no scheme'}")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self._idle = []
+
+    def _request(self, method, path, body=b"", headers=()):
+        lines = [
+            f"{method} {self.prefix}{path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            f"Content-Length: {len(body)}",
+            *headers,
+        ]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    @staticmethod
+    async def _read_head(reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by signal-cli")
+        version, status = status_line.split()[:2]
+        #kept as a pseudo-header: HTTP/1.0 closes the connection unless told otherwise
+        headers = {":version": version.decode("latin-1")}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return int(status), headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    @staticmethod
+    def _chunked(headers):
+        #chunked is always the last coding applied
+        codings = headers.get("transfer-encoding", "").lower().split(",")
+        return codings[-1].strip() == "chunked"
+
+    @classmethod
+    def _reusable(cls, headers):
+        #the connection can carry another request only if the server keeps it open and
+        #this response's end was marked by its framing, not by the server closing it
+        connection = {token.strip() for token in headers.get("connection", "").lower().split(",")}
+        if headers[":version"] == "HTTP/1.0":
+            keep_alive = "keep-alive" in connection
+        else:
+            keep_alive = "close" not in connection
+        return keep_alive and (cls._chunked(headers) or "content-length" in headers)
+
+    @classmethod
+    async def _iter_body(cls, reader, headers):
+        if cls._chunked(headers):
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    #trailers, then the blank line that ends the message
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                yield await reader.readexactly(size)
+                await reader.readexactly(2)
+        elif "content-length" in headers:
+            length = int(headers["content-length"])
+            if length:
+                yield await reader.readexactly(length)
+        else:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    return
+                yield data
+
+    async def _exchange(self, conn, request):
+        reader, writer = conn
+        writer.write(request)
+        await writer.drain()
+        status, headers = await self._read_head(reader)
+        body = b"".join([chunk async for chunk in self._iter_body(reader, headers)])
+        return status, body, self._reusable(headers)
+
+    async def post_json(self, path, payload, timeout):
+        request = self._request(
+            "POST", path, json.dumps(payload).encode("utf-8"),
+            ("Content-Type: application/json", "Connection: keep-alive")
+        )
+
+        #a pooled connection may have been closed by the server in the meantime; retry once on a new one
+        while True:
+            reused = bool(self._idle)
+            conn = self._idle.pop() if reused else await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), timeout
+            )
+            try:
+                status, body, reusable = await asyncio.wait_for(self._exchange(conn, request), timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                conn[1].close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                conn[1].close()
+                raise
+            break
+
+        if reusable:
+            self._idle.append(conn)
+        else:
+            conn[1].close()
+
+        if status >= 400:
+            raise HttpError(status)
+        return json.loads(body)
 
-def rpc_call(method, params):
-    global _rpc_id
-    _rpc_id += 1
-    payload = {
+    async def open_stream(self, path, connect_timeout, idle_timeout):
+        #returns an async iterator of decoded lines once the server has accepted the request;
+        #iterating raises asyncio.TimeoutError if nothing arrives for idle_timeout
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), connect_timeout)
+        try:
+            writer.write(self._request("GET", path, headers=("Accept: text/event-stream",)))
+            await writer.drain()
+            status, headers = await asyncio.wait_for(self._read_head(reader), connect_timeout)
+            if status >= 400:
+                raise HttpError(status)
+        except BaseException:
+            writer.close()
+            raise
+        return self._lines(reader, writer, headers, idle_timeout)
+
+    async def _lines(self, reader, writer, headers, idle_timeout):
+        try:
+            chunks = self._iter_body(reader, headers)
+            pending = b""
+            while True:
+                chunk = await asyncio.wait_for(anext(chunks, None), idle_timeout)
+                if chunk is None:
+                    return
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    yield line.rstrip(b"\r").decode("utf-8", errors="replace")
+        finally:
+            writer.close()
+
+
+try:
+    SIGNAL_HTTP = AsyncHttpClient(SIGNAL_HTTP_URL)
+except ValueError as e:
+    log.error("SIGNAL_HTTP_URL unusable: %s", e)
+    raise SystemExit(1)
+
+
+def _rpc_payload(method, params):
+    return {
         "jsonrpc": "2.0",
         "method": method,
         "params": params,
-        "id": _rpc_id,
+        "id": next(_rpc_ids),
     }
 
+
+async def rpc_call(method, params):
+    payload = _rpc_payload(method, params)
+    started = time.monotonic()
+
     try:
-        r = requests.post(SIGNAL_RPC_URL, json=payload, timeout=60)
-        r.raise_for_status()
-        return r.json()
+        return await SIGNAL_HTTP.post_json(SIGNAL_RPC_PATH, payload, SIGNAL_RPC_TIMEOUT)
     except Exception as e:
-        log.warning(f"Signal RPC error: {e}")
+        metric_inc("bridge_signal_rpc_errors_total", method=method)
+        log.warning(f"Signal RPC error: {e!r}")
         return {}
+    finally:
+        metric_observe("bridge_signal_rpc_seconds", time.monotonic() - started, method=method)
 
+# -------------------------
+# Signal outbound stage
+# -------------------------
+#calls can be submitted from any thread and never block the caller; sender tasks on the
+#bridge loop drain the queue, batching whatever is pending into one JSON-RPC request
 
+SIGNAL_TX_QUEUE = asyncio.Queue(maxsize=SIGNAL_TX_QUEUE_MAX)
 
-def send_to_signal(message, sender_label=None, log_relay=True):
+def _enqueue_rpc(payload, future):
     try:
-        rpc_call("send", {
-            "groupId": SIGNAL_GROUP_ID,
-            "message": message
-        })
-        if log_relay:
-            log.info(f"Relayed Mesh → Signal ({sender_label})")
+        SIGNAL_TX_QUEUE.put_nowait((payload, future))
+    except asyncio.QueueFull:
+        log.warning("Signal send queue full (%s pending). Dropping %s call.", SIGNAL_TX_QUEUE_MAX, payload["method"])
+        future.set_result({})
+
+
+def rpc_submit(method, params):
+    #returns a concurrent.futures.Future resolving to the response dict ({} on failure);
+    #its callbacks run on the bridge loop
+    future = Future()
+    on_loop(_enqueue_rpc, _rpc_payload(method, params), future)
+    return future
+
+
+async def _post_rpc_batch(batch):
+    if len(batch) == 1:
+        body = batch[0][0]
+    else:
+        body = [payload for payload, _ in batch]
+
+    methods = {payload["method"] for payload, _ in batch}
+    method = methods.pop() if len(methods) == 1 else "mixed"
+    started = time.monotonic()
+
+    try:
+        resp = await SIGNAL_HTTP.post_json(SIGNAL_RPC_PATH, body, SIGNAL_RPC_TIMEOUT)
     except Exception as e:
-        log.error("Signal send failed: %s", e)
+        metric_inc("bridge_signal_rpc_errors_total", len(batch), method=method)
+        log.warning(f"Signal RPC error: {e!r}")
+        for _, future in batch:
+            future.set_result({})
+        return
+    finally:
+        metric_observe("bridge_signal_rpc_seconds", time.monotonic() - started, method=method)
+    signal_cli_answered()
+
+    responses = resp if isinstance(resp, list) else [resp]
+    by_id = {item.get("id"): item for item in responses if isinstance(item, dict)}
+
+    #a server that rejects batches answers with a single id-less error; retry the calls one by one
+    if len(batch) > 1 and not any(payload["id"] in by_id for payload, _ in batch):
+        log.debug("Signal RPC batch rejected; sending %s calls individually", len(batch))
+        for item in batch:
+            await _post_rpc_batch([item])
+        return
+
+    for payload, future in batch:
+        result = by_id.get(payload["id"], {})
+        if "error" in result:
+            metric_inc("bridge_signal_rpc_errors_total", method=payload["method"])
+            log.warning("Signal RPC error (%s): %s", payload["method"], result["error"])
+        future.set_result(result)
+
+
+async def signal_tx_worker():
+    while True:
+        batch = [await SIGNAL_TX_QUEUE.get()]
+        while len(batch) < SIGNAL_RPC_BATCH_MAX and not SIGNAL_TX_QUEUE.empty():
+            batch.append(SIGNAL_TX_QUEUE.get_nowait())
+
+        try:
+            await _post_rpc_batch(batch)
+        except Exception as e:
+            log.error("Signal send worker error: %s", e, exc_info=True)
+            for _, future in batch:
+                if not future.done():
+                    future.set_result({})
+
+        for _ in batch:
+            SIGNAL_TX_QUEUE.task_done()
+
+
+def start_signal_tx_workers():
+    for i in range(SIGNAL_TX_WORKERS):
+        spawn(signal_tx_worker(), name=f"signal-tx-{i}")
+
+
+# -------------------------
+# Signal outbox
+# -------------------------
+#mesh → Signal messages wait here until signal-cli has taken them. One drain task keeps them in
+#order: a send that fails in transport (daemon restarting, GC pause, timeout) stays at the head and
+#is retried with jittered backoff; after SIGNAL_BREAKER_THRESHOLD failures in a row the breaker
+#opens and nothing is tried until a single trial send gets through
+
+class CircuitBreaker:
+    #closed: calls go through. open: none for `cooldown` seconds. half_open: one trial call decides
+    def __init__(self, name, threshold, cooldown):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "open" if self.retry_in() > 0 else "half_open"
+
+    def retry_in(self):
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def success(self):
+        if self.opened_at is not None:
+            log.info("%s answering again; sending resumes", self.name)
+        self.failures = 0
+        self.opened_at = None
+
+    def failure(self):
+        self.failures += 1
+        if self.opened_at is None and self.failures < self.threshold:
+            return
+        if self.opened_at is None:
+            log.warning("%s failed %s times in a row; holding sends, next try in %ss", self.name, self.failures, self.cooldown)
+        self.opened_at = time.monotonic()
+
+
+class SignalOutbox:
+    def __init__(self):
+        self._entries = collections.deque()
+        #id -> Future for whoever is waiting on a send; entries loaded from disk have none
+        self._futures = {}
+        self._wake = asyncio.Event()
+        #entries handed to signal-cli and not answered yet
+        self._sending = []
+        self.journal = None
+        self.breaker = CircuitBreaker("signal-cli", SIGNAL_BREAKER_THRESHOLD, SIGNAL_BREAKER_COOLDOWN)
+        self.stats = {"sent": 0, "retried": 0, "rejected": 0, "given_up": 0, "expired": 0, "overflow": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, entry, future=None):
+        #bridge loop
+        if len(self._entries) >= SIGNAL_TX_QUEUE_MAX:
+            self.stats["overflow"] += 1
+            log.warning(
+                "Signal outbox full (%s waiting). Dropping message from %s.",
+                len(self._entries), entry.get("sender_label") or "bridge"
+            )
+            if future is not None:
+                future.set_result({})
+            ha_release(entry.pop("ha_keys", None))
+            return False
+
+        self._entries.append(entry)
+        if future is not None:
+            self._futures[entry["id"]] = future
+        if self.journal:
+            self.journal.add(entry)
+        self._wake.set()
+        return True
+
+    def _finish(self, entry, outcome, resp):
+        self._entries.remove(entry)
+        self.stats[outcome] += 1
+        if self.journal:
+            self.journal.remove(entry)
+        future = self._futures.pop(entry["id"], None)
+        if future is not None:
+            future.set_result(resp)
+        ha_release(entry.pop("ha_keys", None))
+
+        label = entry.get("sender_label") or "bridge"
+        if outcome == "sent":
+            if entry.get("log_relay"):
+                log.info(f"Relayed Mesh → Signal ({label})")
+        elif outcome == "expired":
+            log.error("Signal send dropped (%s): still undelivered after %ss", label, SIGNAL_TX_TTL)
+        elif outcome == "given_up":
+            log.error("Signal send failed (%s) after %s attempts", label, entry["attempt"])
+        else:
+            log.error("Signal send failed (%s)", label)
+
+    def drop_held(self):
+        #HA demotion: see MeshTxQueue.drop_held; what signal-cli already has is left to finish
+        held = [e for e in self._entries if e.get("ha_keys") and e not in self._sending]
+        for entry in held:
+            self._entries.remove(entry)
+            if self.journal:
+                self.journal.remove(entry)
+            future = self._futures.pop(entry["id"], None)
+            if future is not None:
+                future.set_result({})
+        return len(held)
+
+    def _expire(self):
+        if SIGNAL_TX_TTL <= 0:
+            return
+        cutoff = time.time() - SIGNAL_TX_TTL
+        for entry in [e for e in self._entries if e["enqueued"] < cutoff]:
+            self._finish(entry, "expired", {})
+
+    async def run(self):
+        while True:
+            self._expire()
+            if not self._entries:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+
+            #open breaker: fail nothing, send nothing, just wait for the trial
+            wait = self.breaker.retry_in()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            trial = self.breaker.state() == "half_open"
+            batch = self._sending = list(itertools.islice(self._entries, 1 if trial else SIGNAL_RPC_BATCH_MAX))
+            try:
+                responses = await asyncio.gather(
+                    *(asyncio.wrap_future(rpc_submit("send", entry["params"])) for entry in batch)
+                )
+            finally:
+                self._sending = []
+
+            transport_failed = False
+            backoff_attempt = 1
+            for entry, resp in zip(batch, responses):
+                if "result" in resp:
+                    self._finish(entry, "sent", resp)
+                elif resp:
+                    #signal-cli answered with an error; sending it again would get the same answer
+                    self._finish(entry, "rejected", resp)
+                else:
+                    transport_failed = True
+                    #a failed trial says signal-cli is still down, not that this message is at fault
+                    if not trial:
+                        entry["attempt"] += 1
+                    if entry["attempt"] > SIGNAL_TX_RETRIES:
+                        self._finish(entry, "given_up", resp)
+                        continue
+                    self.stats["retried"] += 1
+                    if self.journal:
+                        self.journal.add(entry)
+                    backoff_attempt = max(backoff_attempt, entry["attempt"])
+
+            if not transport_failed:
+                self.breaker.success()
+                continue
+
+            self.breaker.failure()
+            if self.breaker.state() == "closed":
+                delay = min(SIGNAL_TX_BACKOFF * 2 ** (backoff_attempt - 1), SIGNAL_TX_BACKOFF_MAX)
+                #jitter keeps a restarted signal-cli from being hit by every bridge at the same instant
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+
+SIGNAL_OUTBOX = SignalOutbox()
+
+def start_signal_outbox():
+    if SIGNAL_TX_PERSIST:
+        try:
+            os.makedirs(BRIDGE_DATA_DIR, exist_ok=True)
+            journal = TxJournal(os.path.join(BRIDGE_DATA_DIR, "signal_tx.db"), "signal_tx")
+            saved = journal.load()
+        except (OSError, sqlite3.Error) as e:
+            log.error("Signal outbox journal unavailable, outbox is memory-only: %s", e)
+        else:
+            SIGNAL_OUTBOX.journal = journal
+            threading.Thread(target=journal.run, name="signal-tx-journal", daemon=True).start()
+            for entry in saved:
+                SIGNAL_OUTBOX.put(entry)
+            log.info("Signal outbox journal: %s (%s waiting)", journal.path, len(saved))
+
+    spawn(SIGNAL_OUTBOX.run(), name="signal-outbox")
+
+
+def send_to_signal(message, sender_label=None, log_relay=True, group_id=None, ha_keys=None):
+    #returns a concurrent.futures.Future resolving to the response once the outbox is done with
+    #the message: sent, rejected by signal-cli, or given up on ({})
+    #ha_keys: the HA claims this send finishes, if it is not made while handling the message (see ha_hold)
+    future = Future()
+    entry = {
+        "id": uuid.uuid4().hex,
+        "enqueued": time.time(),
+        "params": {"groupId": group_id or SIGNAL_GROUP_ID, "message": message},
+        "sender_label": sender_label,
+        "log_relay": log_relay,
+        "attempt": 0,
+        "ha_keys": ha_keys if ha_keys is not None else ha_hold(),
+    }
+    on_loop(SIGNAL_OUTBOX.put, entry, future)
+    return future
+
+# -------------------------
+# Node name index
+# -------------------------
+#display labels by node id, kept current from node info events so a packet costs one dict
+#lookup; snapshotted to BRIDGE_DATA_DIR/nodes.json so names are right straight after a restart
+
+#seconds between snapshots while names are changing
+NODE_INDEX_SAVE_INTERVAL = 60
+
+NODE_LABELS = {}
+_node_index_dirty = threading.Event()
+
+def node_label(user):
+    if not user:
+        return None
+    short_name = (user.get("shortName") or "").strip()
+    if short_name:
+        return short_name
+    long_name = (user.get("longName") or "").split()
+    if long_name:
+        return long_name[0][:8]
+    return None
+
+def index_node(node_id, user):
+    label = node_label(user)
+    if node_id and label and NODE_LABELS.get(node_id) != label:
+        NODE_LABELS[node_id] = label
+        _node_index_dirty.set()
+    return label
+
+def on_node_updated(node, interface):
+    #node DB entries, sent while the radio hands over its node list on connect
+    user = node.get("user") or {}
+    index_node(user.get("id"), user)
+
+def on_node_info(packet, interface):
+    #NODEINFO_APP broadcasts heard on the mesh
+    user = packet.get("decoded", {}).get("user") or {}
+    index_node(user.get("id") or packet.get("fromId"), user)
+
+def _node_index_path():
+    return os.path.join(BRIDGE_DATA_DIR, "nodes.json")
+
+def load_node_index():
+    try:
+        with open(_node_index_path(), encoding="utf-8") as f:
+            labels = json.load(f)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as e:
+        log.warning("Node index: could not read %s: %s", _node_index_path(), e)
+        return
+    if not isinstance(labels, dict):
+        log.warning("Node index: ignoring %s, expected a JSON object", _node_index_path())
+        return
+
+    NODE_LABELS.update({k: v for k, v in labels.items() if isinstance(v, str) and v})
+    log.info("Node index: loaded %d names from %s", len(NODE_LABELS), _node_index_path())
+
+def save_node_index():
+    _node_index_dirty.clear()
+    path = _node_index_path()
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(NODE_LABELS.copy(), f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def node_index_writer():
+    while True:
+        _node_index_dirty.wait()
+        #let a burst of updates (e.g. the node list on connect) land in one write
+        time.sleep(NODE_INDEX_SAVE_INTERVAL)
+        try:
+            save_node_index()
+        except OSError as e:
+            log.warning("Node index: could not save %s: %s", _node_index_path(), e)
+
+def start_node_index():
+    #before the radio connects, so the node list it sends on connect is indexed as it arrives
+    try:
+        os.makedirs(BRIDGE_DATA_DIR, exist_ok=True)
+    except OSError as e:
+        log.warning("Node index: %s unavailable, names will not persist: %s", BRIDGE_DATA_DIR, e)
+    load_node_index()
+    mesh_subscribe(on_node_updated, "meshtastic.node.updated")
+    mesh_subscribe(on_node_info, "meshtastic.receive.user")
+    threading.Thread(target=node_index_writer, daemon=True).start()
+
+def seed_node_index(iface):
+    for node_id, node in list((iface.nodes or {}).items()):
+        index_node(node_id, node.get("user"))
 
 # -------------------------
 # Mesh helpers
 # -------------------------
         
-def send_to_mesh(iface, message, sender_label=None, log_relay=False):
-    MESH_TX_QUEUE.put((message, sender_label, log_relay))
+def send_to_mesh(iface, message, sender_label=None, log_relay=False, kind="reply", parts=None, channel=None, via=None, dest=None, **extra):
+    #kind: "alert" for operator messages from Signal, "relay" for other Signal → Mesh traffic,
+    #"reply" for bridge/command messages; see MESH_PRIORITY
+    #parts: the packets to send for this message, in order, as one unit
+    #channel: mesh channel index, MESH_CHANNEL_INDEX if not given
+    #via: device path of the radio that should send it, if it is up (see radio_accepts)
+    #dest: node id for a direct message, None to broadcast on the channel
+    #extra: further item fields, e.g. the tag MeshTxQueue.amend() looks for
+    return MESH_TX_QUEUE.put({
+        **extra,
+        "id": uuid.uuid4().hex,
+        "channel": MESH_CHANNEL_INDEX if channel is None else channel,
+        "via": via,
+        "dest": dest,
+        "message": message,
+        "parts": parts or [message],
+        "sender_label": sender_label,
+        "log_relay": log_relay,
+        "kind": kind,
+        "ha_keys": ha_hold(),
+    })
+
+def get_node_display_name(node_id, interface=None):
+    label = NODE_LABELS.get(node_id)
+    if label:
+        return label
+
+    #not indexed yet (no node info heard since the last snapshot)
+    try:
+        if node_id and interface is not None and node_id in interface.nodes:
+            label = index_node(node_id, interface.nodes[node_id].get("user"))
+            if label:
+                return label
+    except Exception:
+        pass
+
+    if node_id and node_id.startswith("!") and len(node_id) > 5:
+        return node_id[1:][-4:].upper()
+
+    return "????"
+
+# -------------------------
+# Mesh ingress shield
+# -------------------------
+#cheap checks on the pubsub thread before a packet costs us a name lookup, a command
+#dispatch or a reply: a token bucket per node, one for the whole channel, and a short
+#deny list for nodes that blow through their bucket
+
+#nodes tracked at once; the least recently heard are forgotten first
+INGRESS_MAX_NODES = 1024
+
+#how long after being denied a node still gets no error replies in silent mode
+INGRESS_QUIET_SECONDS = 3600
+
+INGRESS_STATS = {"accepted": 0, "shed_node": 0, "shed_global": 0, "shed_denied": 0, "quiet_replies": 0}
+
+_ingress_nodes = collections.OrderedDict()
+_ingress_global = (
+    TokenBucket(MESH_INGRESS_GLOBAL_RATE / 60, max(1.0, MESH_INGRESS_GLOBAL_RATE / 6))
+    if MESH_INGRESS_GLOBAL_RATE > 0 else None
+)
+
+def _ingress_state(node_id):
+    state = _ingress_nodes.get(node_id)
+    if state is None:
+        state = _ingress_nodes[node_id] = {
+            "bucket": TokenBucket(MESH_INGRESS_NODE_RATE / 60, MESH_INGRESS_NODE_BURST),
+            "denied_until": 0.0,
+            "last_denied": 0.0,
+        }
+        if len(_ingress_nodes) > INGRESS_MAX_NODES:
+            _ingress_nodes.popitem(last=False)
+    else:
+        _ingress_nodes.move_to_end(node_id)
+    return state
+
+
+def ingress_allow(node_id):
+    if node_id in BRIDGE_NODE_IDS or MESH_INGRESS_NODE_RATE <= 0:
+        return True
+
+    now = time.monotonic()
+    state = _ingress_state(node_id)
+
+    if now < state["denied_until"]:
+        INGRESS_STATS["shed_denied"] += 1
+        return False
+
+    if not state["bucket"].take():
+        INGRESS_STATS["shed_node"] += 1
+        state["denied_until"] = now + MESH_INGRESS_DENY_SECONDS
+        state["last_denied"] = now
+        log.warning(
+            "Mesh ingress: %s is over %s msgs/min, ignoring it for %ss",
+            node_id, MESH_INGRESS_NODE_RATE, MESH_INGRESS_DENY_SECONDS
+        )
+        return False
+
+    if _ingress_global and not _ingress_global.take():
+        INGRESS_STATS["shed_global"] += 1
+        log.debug("Mesh ingress: channel budget exhausted, dropped message from %s", node_id)
+        return False
+
+    INGRESS_STATS["accepted"] += 1
+    return True
+
+
+def ingress_is_quiet(node_id):
+    if not MESH_INGRESS_SILENT:
+        return False
+    state = _ingress_nodes.get(node_id)
+    return bool(state and state["last_denied"]) and time.monotonic() - state["last_denied"] < INGRESS_QUIET_SECONDS
 
-def get_node_display_name(node_id, interface):
-    try:
-        if node_id and node_id in interface.nodes:
-            user = interface.nodes[node_id].get("user", {})
-            if user.get("shortName"):
-                return user["shortName"].strip()
-            if user.get("longName"):
-                return user["longName"].split()[0][:8]
-    except Exception:
-        pass
 
-    if node_id and node_id.startswith("!") and len(node_id) > 5:
-        return node_id[1:][-4:].upper()
+def send_reply(iface, ctx, message, **extra):
+    #command replies go back out on the channel, and the radio, the command came in on;
+    #with MESH_REPLY_MODE=direct only to the node that sent it, so nobody else rebroadcasts it
+    dest = ctx["node_id"] if MESH_REPLY_MODE == "direct" else None
+    send_to_mesh(iface, message, channel=ctx["channel"], via=ctx.get("via"), dest=dest, **extra)
 
-    return "????"
+
+def send_error_reply(iface, ctx, message):
+    #replies to bad input; a flooding node doesn't get to turn its junk into our airtime
+    if ctx.get("quiet"):
+        INGRESS_STATS["quiet_replies"] += 1
+        log.debug("Silent mode: no error reply to %s (%s)", ctx.get("node_id"), message)
+        return
+    send_reply(iface, ctx, message)
 
 # -------------------------
 # Mesh command handling
@@ -251,13 +2369,44 @@ def test(args, iface, ctx):
     else:
         hop_text = f"{hops} hops"
 
-    send_to_mesh(
-        iface,
-        format_bridge_message(f"{hop_text}")
-    )
+    #while an earlier !test reply on this channel is still waiting for airtime, this node joins it
+    tester = [ctx["node_id"], ctx["label"], hop_text]
+
+    def join(item):
+        testers = [t for t in item["testers"] if t[0] != ctx["node_id"]] + [tester]
+        changes = {"testers": testers, "message": test_reply_text(testers)}
+        changes["parts"] = [changes["message"]]
+        if len(testers) > 1:
+            changes.update(dest=None, via=None)
+        #this node's HA claim is finished once the joined reply is sent, not before
+        ha_keys = (item.get("ha_keys") or []) + (ha_hold() or [])
+        changes["ha_keys"] = ha_keys or None
+        return changes
+
+    if MESH_TX_QUEUE.amend(ctx["channel"], "test", join):
+        return
+
+    send_reply(iface, ctx, test_reply_text([tester]), tag="test", testers=[tester])
 
 test.description = "!test — Verify bridge is online, hop distance to bridge."
 
+
+def test_reply_text(testers):
+    #one requester: just the hops; several: "name hops" for as many as fit in one packet
+    if len(testers) == 1:
+        return format_bridge_message(testers[0][2])
+
+    shown = []
+    for _, label, hop_text in testers:
+        candidate = shown + [f"{label} {hop_text}"]
+        more = len(testers) - len(candidate)
+        text = format_bridge_message(", ".join(candidate) + (f" +{more} more" if more else ""))
+        if shown and utf8_len(text) > MESH_MAX_PAYLOAD:
+            break
+        shown = candidate
+    more = len(testers) - len(shown)
+    return format_bridge_message(", ".join(shown) + (f" +{more} more" if more else ""))
+
 #! these two should be testing only in an adversarial env, 
 #the potential for abuse should be obvious
 #! as it stands, they are disabled in mode 2 and enabled in modes 1 and 3
@@ -265,19 +2414,20 @@ test.description = "!test — Verify bridge is online, hop distance to bridge."
 #On command
 @mesh_command("on")
 def relay_on(args, iface, ctx):
-    global RELAY_ENABLED
+    routes = ctx["routes"]
 
-    if RELAY_ENABLED:
-        send_to_mesh(
-            iface,
+    if all(route["enabled"] for route in routes):
+        send_reply(
+            iface, ctx,
             format_bridge_message("Relay already enabled. Use !off to disable.")
         )
         return
 
-    RELAY_ENABLED = True
-    log.info(f"Relay ENABLED ({ctx['label']})")
-    send_to_mesh(
-        iface,
+    for route in routes:
+        route["enabled"] = True
+    log.info(f"Relay ENABLED on channel {ctx['channel']} ({ctx['label']})")
+    send_reply(
+        iface, ctx,
         format_bridge_message("Relay enabled. Use !off to disable.")
     )
 
@@ -286,19 +2436,20 @@ relay_on.description = "!on — Enable message relaying."
 #!Off command
 @mesh_command("off")
 def relay_off(args, iface, ctx):
-    global RELAY_ENABLED
+    routes = ctx["routes"]
 
-    if not RELAY_ENABLED:
-        send_to_mesh(
-            iface,
+    if not any(route["enabled"] for route in routes):
+        send_reply(
+            iface, ctx,
             format_bridge_message("Relay already disabled. Use !on to enable.")
         )
         return
 
-    RELAY_ENABLED = False
-    log.info(f"Relay DISABLED ({ctx['label']})")
-    send_to_mesh(
-        iface,
+    for route in routes:
+        route["enabled"] = False
+    log.info(f"Relay DISABLED on channel {ctx['channel']} ({ctx['label']})")
+    send_reply(
+        iface, ctx,
         format_bridge_message("Relay disabled. Use !on to enable.")
     )
 
@@ -310,8 +2461,8 @@ relay_off.description = "!off — Disable all message relaying."
 #Mode command
 @mesh_command("mode")
 def mode(args, iface, ctx):
-    send_to_mesh(
-        iface,
+    send_reply(
+        iface, ctx,
         format_bridge_message("Use !mode1, !mode2, !mode3, or !help mode1/2/3")
     )
 
@@ -320,11 +2471,10 @@ mode.description = "!mode — Set relay modes using !mode[1,2,3]."
 #Mode1 command
 @mesh_command("mode1")
 def mode1(args, iface, ctx):
-    global RELAY_MODE
-    RELAY_MODE = 1
-    log.info(f"MODE1 enabled ({ctx['label']})")
-    send_to_mesh(
-        iface,
+    set_routes_mode(ctx["routes"], 1)
+    log.info(f"MODE1 enabled on channel {ctx['channel']} ({ctx['label']})")
+    send_reply(
+        iface, ctx,
         format_bridge_message("MODE1 enabled. Relay all messages between Mesh and Signal. Default.")
     )
 
@@ -334,11 +2484,10 @@ mode1.description = "!mode1 — Relay all messages between Mesh and Signal. Defa
 #Mode2 command
 @mesh_command("mode2")
 def mode2(args, iface, ctx):
-    global RELAY_MODE
-    RELAY_MODE = 2
-    log.info(f"MODE2 enabled ({ctx['label']})")
-    send_to_mesh(
-        iface,
+    set_routes_mode(ctx["routes"], 2)
+    log.info(f"MODE2 enabled on channel {ctx['channel']} ({ctx['label']})")
+    send_reply(
+        iface, ctx,
         format_bridge_message(
             "MODE2 enabled. Relay all Signal → Mesh. Mesh → Signal REQUIRES !relay [message]."
         )
@@ -349,11 +2498,10 @@ mode2.description = "!mode2 — Relay all Signal → Mesh. Mesh → Signal REQUI
 #Mode3 command
 @mesh_command("mode3")
 def mode3(args, iface, ctx):
-    global RELAY_MODE
-    RELAY_MODE = 3
-    log.info(f"MODE3 enabled ({ctx['label']})")
-    send_to_mesh(
-        iface,
+    set_routes_mode(ctx["routes"], 3)
+    log.info(f"MODE3 enabled on channel {ctx['channel']} ({ctx['label']})")
+    send_reply(
+        iface, ctx,
         format_bridge_message(
             "MODE3 enabled. Mesh → Signal ONLY via !relay [message]. Signal → Mesh relay DISABLED."
         )
@@ -364,7 +2512,7 @@ mode3.description = "!mode3 — Mesh → Signal ONLY via !relay [message]. Signa
 #!Status command
 @mesh_command("status")
 def status(args, iface, ctx):
-    send_to_mesh(iface, build_status_message())
+    send_reply(iface, ctx, build_status_message(ctx["routes"]))
 
 status.description = "!status — Show relay state and active mode."
 
@@ -372,23 +2520,21 @@ status.description = "!status — Show relay state and active mode."
 @mesh_command("relay")
 def relay(args, iface, ctx):
     if not args:
-        send_to_mesh(iface, format_bridge_message("Usage: !relay <message>"))
+        send_error_reply(iface, ctx, format_bridge_message("Usage: !relay <message>"))
         return
 
     message = " ".join(args)
     sender = ctx["label"]
 
-    if RELAY_MODE == 1:
-        send_to_mesh(
-            iface,
+    if routes_mode(ctx["routes"]) == 1:
+        send_reply(
+            iface, ctx,
             format_bridge_message("MODE1 enabled. !relay not needed in this mode.")
         )
 
-    if RELAY_MODE in (1, 2, 3):
-        send_to_signal(
-            format_mesh_to_signal(sender, message),
-            sender_label=sender
-        )
+    for route in ctx["routes"]:
+        if route["direction"] != "signal_to_mesh":
+            relay_to_signal(sender, message, route["group"])
 
 relay.description = "!relay <message> — Explicitly relay a message using the bridge. Modes[2,3] only."
 
@@ -397,33 +2543,36 @@ relay.description = "!relay <message> — Explicitly relay a message using the b
 #Help command
 @mesh_command("help")
 def help(args, iface, ctx):
-    available = get_available_commands()
+    relay_mode = routes_mode(ctx["routes"])
+    available = get_available_commands(relay_mode)
 
     if args:
         cmd = args[0].lower()
 
         if cmd not in COMMAND_REGISTRY:
-            send_to_mesh(iface, format_bridge_message("Unknown command. Try !help."))
+            send_error_reply(iface, ctx, format_bridge_message("Unknown command. Try !help."))
             log.info(f"Mesh !help for unknown command: !{cmd} ({ctx['label']})")
             return
 
         if cmd not in available:
-            send_to_mesh(iface, format_bridge_message(f"!{cmd} is not available in MODE{RELAY_MODE}."))
+            send_error_reply(iface, ctx, format_bridge_message(f"!{cmd} is not available in MODE{relay_mode}."))
             return
 
         log.info(f"Mesh !help for command: !{cmd} ({ctx['label']})")
         desc = getattr(COMMAND_REGISTRY[cmd], "description", "No help available.")
-        send_to_mesh(iface, format_bridge_message(desc))
+        send_reply(iface, ctx, format_bridge_message(desc))
         return
 
-    cmd_list = ", ".join(f"!{name}" for name in available if name != "help")
-    send_to_mesh(
-        iface,
-        format_bridge_message(f"Try {cmd_list}, or !help [command]")
-    )
+    send_reply(iface, ctx, help_listing(relay_mode))
 
 help.description = "!help [command] — Show help for a command."
 
+
+@functools.lru_cache(maxsize=8)
+def help_listing(relay_mode):
+    cmd_list = ", ".join(f"!{name}" for name in get_available_commands(relay_mode) if name != "help")
+    return format_bridge_message(f"Try {cmd_list}, or !help [command]")
+
 # -------------------------
 # Mode-based command restrictions
 # -------------------------
@@ -434,12 +2583,12 @@ MODE_BLOCKED_COMMANDS = {
     3: {"on", "off", "mode", "mode1", "mode2", "mode3"},
 }
 
-def is_command_blocked(command):
-    blocked = MODE_BLOCKED_COMMANDS.get(RELAY_MODE, set())
+def is_command_blocked(command, relay_mode):
+    blocked = MODE_BLOCKED_COMMANDS.get(relay_mode, set())
     return command in blocked
 
-def get_available_commands():
-    blocked = MODE_BLOCKED_COMMANDS.get(RELAY_MODE, set())
+def get_available_commands(relay_mode):
+    blocked = MODE_BLOCKED_COMMANDS.get(relay_mode, set())
     return {name: handler for name, handler in COMMAND_REGISTRY.items() if name not in blocked}
 
 # -------------------------
@@ -452,7 +2601,7 @@ def handle_mesh_command(text, iface, ctx):
 
     parts = text[len(COMMAND_PREFIX):].strip().split()
     if not parts:
-        send_to_mesh(iface, format_bridge_message("Empty command. Try !help."))
+        send_error_reply(iface, ctx, format_bridge_message("Empty command. Try !help."))
         return True
 
     command = parts[0].lower()
@@ -460,39 +2609,444 @@ def handle_mesh_command(text, iface, ctx):
 
     handler = COMMAND_REGISTRY.get(command)
     if not handler:
-        send_to_mesh(iface, format_bridge_message("Unknown command. Try !help."))
+        send_error_reply(iface, ctx, format_bridge_message("Unknown command. Try !help."))
         log.info(f"Unknown command: !{command} ({ctx['label']})")
         return True
 
-    if is_command_blocked(command):
-        send_to_mesh(iface, format_bridge_message(f"!{command} is not available in MODE{RELAY_MODE}."))
-        log.info(f"Blocked command: !{command} in MODE{RELAY_MODE} ({ctx['label']})")
+    relay_mode = routes_mode(ctx["routes"])
+    if is_command_blocked(command, relay_mode):
+        send_error_reply(iface, ctx, format_bridge_message(f"!{command} is not available in MODE{relay_mode}."))
+        log.info(f"Blocked command: !{command} in MODE{relay_mode} ({ctx['label']})")
         return True
 
     log.info(f"Executing mesh command: !{command} ({ctx['label']})")
-    handler(args, iface, ctx)
+    #handlers may be coroutines; those run as their own task so a slow one holds nothing up
+    result = handler(args, iface, ctx)
+    if asyncio.iscoroutine(result):
+        spawn(ha_held(result, ha_hold()), name=f"command-{command}")
     return True
 
+# -------------------------
+# Duplicate suppression
+# -------------------------
+#multi-path reception, several radios, and stream/poll overlap on the Signal side can each deliver
+#the same message twice; one fixed-size cache per direction catches the copies
+
+DEDUPE_MAX_ENTRIES = 2048
+DEDUPE_WINDOW = 600
+
+DEDUPE_HITS = {"mesh": 0, "signal": 0}
+
+class DedupeCache:
+    #keys seen in the last `window` seconds, at most `max_entries` of them (oldest go first),
+    #so memory stays flat however hard the bridge is flooded
+    def __init__(self, name, max_entries=DEDUPE_MAX_ENTRIES, window=DEDUPE_WINDOW):
+        self.name = name
+        self.max_entries = max_entries
+        self.window = window
+        self._seen = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, key):
+        #True the first time a key turns up, False for every copy inside the window
+        now = time.monotonic()
+        with self._lock:
+            while self._seen:
+                oldest, seen_at = next(iter(self._seen.items()))
+                if now - seen_at <= self.window and len(self._seen) < self.max_entries:
+                    break
+                del self._seen[oldest]
+            if key in self._seen:
+                DEDUPE_HITS[self.name] += 1
+                return False
+            self._seen[key] = now
+            return True
+
+    def __len__(self):
+        return len(self._seen)
+
+
+MESH_DEDUPE = DedupeCache("mesh")
+SIGNAL_DEDUPE = DedupeCache("signal")
+
+# -------------------------
+# High availability
+# -------------------------
+#two bridges, each with its own radio and signal-cli, share one SQLite file (BRIDGE_HA_LEASE_FILE).
+#Whoever holds its lease relays; the standby receives everything too but only remembers it.
+#Claims are two-phase: the leader records a message as "pending" under its lease epoch before acting
+#on it, and as "sent" once everything it queued for that message has left the bridge. A new leader
+#replays what it remembers unless it is "sent", taking over claims an earlier epoch left "pending",
+#so a failover neither loses what the old leader still had queued nor sends anything twice
+
+HA_PENDING_MAX = 2000
+
+HA_ENABLED = bool(BRIDGE_HA_LEASE_FILE)
+HA_STATS = {"claimed": 0, "taken_over": 0, "already_claimed": 0, "claim_failed": 0, "promoted": 0, "demoted": 0}
+
+class HaLease:
+    #one connection per thread: renewals and claims run on separate threads so a burst of
+    #claims can't hold up the renewal that keeps the lease
+    def __init__(self, path, holder, seconds):
+        self.path = path
+        self.holder = holder
+        self.seconds = seconds
+        #epoch of the lease we hold (or last held); raised whenever the lease changes hands
+        self.epoch = 0
+        self._local = threading.local()
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            #default rollback journal: WAL's shared-memory index does not work between hosts
+            db = sqlite3.connect(self.path, timeout=self.seconds / 3, isolation_level=None)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS lease "
+                "(id INTEGER PRIMARY KEY CHECK (id = 1), holder TEXT, expires REAL, epoch INTEGER, state TEXT)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS claims "
+                "(key TEXT PRIMARY KEY, holder TEXT, epoch INTEGER, status TEXT, at REAL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS claims_at ON claims (at)")
+            #lease files from before two-phase claims: what was claimed then counts as sent
+            for table, column, default in (("lease", "epoch", 0), ("claims", "epoch", 0), ("claims", "status", "'sent'")):
+                if column not in [row[1] for row in db.execute(f"PRAGMA table_info({table})")]:
+                    try:
+                        db.execute(f"ALTER TABLE {table} ADD COLUMN {column} DEFAULT {default}")
+                    except sqlite3.OperationalError:
+                        #the other bridge added it first
+                        pass
+            self._local.db = db
+        return db
+
+    def renew(self, state):
+        #takes or extends the lease if it is free, expired or ours, saving our route state with it;
+        #returns (leader, route state saved before this call)
+        db = self._connect()
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT holder, expires, epoch, state FROM lease WHERE id = 1").fetchone()
+            if row and row[0] != self.holder and row[1] > now:
+                db.execute("COMMIT")
+                return False, None
+            epoch = row[2] if row and row[0] == self.holder and row[1] > now else (row[2] if row else 0) + 1
+            db.execute(
+                "INSERT OR REPLACE INTO lease (id, holder, expires, epoch, state) VALUES (1, ?, ?, ?, ?)",
+                (self.holder, now + self.seconds, epoch, state)
+            )
+            db.execute("DELETE FROM claims WHERE at < ?", (now - DEDUPE_WINDOW,))
+            db.execute("COMMIT")
+        except sqlite3.Error:
+            try:
+                db.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            raise
+        self.epoch = epoch
+        return True, row[3] if row else None
+
+    def claim(self, key):
+        #True if this bridge should act on the message: nobody claimed it yet, or a leader of an
+        #earlier epoch claimed it and never got it out
+        db = self._connect()
+        now = time.time()
+        cur = db.execute(
+            "INSERT OR IGNORE INTO claims (key, holder, epoch, status, at) VALUES (?, ?, ?, 'pending', ?)",
+            (key, self.holder, self.epoch, now)
+        )
+        if cur.rowcount == 1:
+            return "claimed"
+        cur = db.execute(
+            "UPDATE claims SET holder = ?, epoch = ?, at = ? WHERE key = ? AND status = 'pending' AND epoch < ?",
+            (self.holder, self.epoch, now, key, self.epoch)
+        )
+        return "taken_over" if cur.rowcount == 1 else None
+
+    def mark_sent(self, key):
+        self._connect().execute(
+            "UPDATE claims SET status = 'sent' WHERE key = ? AND holder = ?", (key, self.holder)
+        )
+
+    def sent_keys(self, keys):
+        #which of these messages some leader has finished with
+        db = self._connect()
+        done = set()
+        keys = list(keys)
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = db.execute(
+                f"SELECT key FROM claims WHERE status = 'sent' AND key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            done.update(row[0] for row in rows)
+        return done
+
+
+HA_LEASE = HaLease(BRIDGE_HA_LEASE_FILE, BRIDGE_HA_NODE_ID, BRIDGE_HA_LEASE_SECONDS) if HA_ENABLED else None
+HA_LEASE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ha-lease")
+HA_CLAIM_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ha-claim")
+HA_LEADER = not HA_ENABLED
+#monotonic time of the last renewal that reached the lease file
+HA_RENEWED_AT = 0.0
+
+#standby: (received, key, handler, args) of each message it would have acted on, oldest first
+HA_PENDING = collections.deque(maxlen=HA_PENDING_MAX)
+
+#claim key of the message being handled; tasks and callbacks its handler starts inherit it
+HA_CURRENT_KEY = contextvars.ContextVar("ha_current_key", default=None)
+#claim key -> sends (and running command coroutines) it is still waiting on
+HA_OUTSTANDING = {}
+
+#route on/off and mode as last written to the lease; a change wakes the lease loop early
+HA_SAVED_STATE = None
+HA_STATE_CHANGED = asyncio.Event()
+
+def ha_route_state():
+    return json.dumps({route["name"]: [route["enabled"], route["mode"]] for route in ROUTES}, sort_keys=True)
+
+
+def ha_apply_route_state(state):
+    #a new leader carries on with the !on/!off/!mode settings the old one had
+    try:
+        saved = json.loads(state)
+    except (TypeError, ValueError):
+        return
+    for route in ROUTES:
+        if route["name"] in saved:
+            route["enabled"], route["mode"] = saved[route["name"]]
+
+
+def _trim_pending():
+    #claims are kept as long as the dedupe window, so that is as far back as a replay can look
+    cutoff = time.monotonic() - DEDUPE_WINDOW
+    while HA_PENDING and HA_PENDING[0][0] < cutoff:
+        HA_PENDING.popleft()
+
+
+def ha_hold():
+    #called by whatever queues a send while a claimed message is handled; returns the keys the
+    #send must hand back to ha_release() once it has left the bridge (or been dropped)
+    key = HA_CURRENT_KEY.get()
+    if key is None:
+        return None
+    HA_OUTSTANDING[key] = HA_OUTSTANDING.get(key, 0) + 1
+    return [key]
+
+
+def ha_release(keys):
+    #bridge loop; a claim is "sent" once the last send it caused is done
+    if not HA_ENABLED:
+        return
+    for key in keys or ():
+        left = HA_OUTSTANDING.get(key, 0) - 1
+        if left > 0:
+            HA_OUTSTANDING[key] = left
+            continue
+        #not counted at all: held by a send that survived a restart in a journal
+        HA_OUTSTANDING.pop(key, None)
+        spawn(ha_mark_sent(key))
+
+
+async def ha_held(coro, keys):
+    #a command coroutine keeps its message's claim open until it has queued everything it will
+    try:
+        return await coro
+    finally:
+        ha_release(keys)
+
+
+async def ha_mark_sent(key):
+    try:
+        await BRIDGE_LOOP.run_in_executor(HA_CLAIM_EXECUTOR, HA_LEASE.mark_sent, key)
+    except sqlite3.Error as e:
+        log.warning("HA: could not mark a claim sent: %s", e)
+
+
+def ha_dispatch(key, handler, *args):
+    #bridge loop; key names the message identically on both bridges (None if it can't be told apart)
+    if not HA_ENABLED or (HA_LEADER and key is None):
+        handler(*args)
+        return
+    if HA_LEADER:
+        spawn(ha_run(json.dumps(key), handler, args))
+    elif key is not None:
+        HA_PENDING.append((time.monotonic(), json.dumps(key), handler, args))
+        _trim_pending()
+
+
+async def ha_run(key, handler, args):
+    #claims go through one thread in order, so messages are still handled in the order they came
+    try:
+        claimed = await BRIDGE_LOOP.run_in_executor(HA_CLAIM_EXECUTOR, HA_LEASE.claim, key)
+    except sqlite3.Error as e:
+        #relaying unclaimed could double up with a standby that has taken over meanwhile;
+        #held like a standby's messages, it goes out once the file answers again (or the other leader has it)
+        log.warning("HA claim failed, holding the message until the lease file answers: %s", e)
+        HA_STATS["claim_failed"] += 1
+        HA_PENDING.append((time.monotonic(), key, handler, args))
+        return
+    if claimed is None:
+        HA_STATS["already_claimed"] += 1
+        return
+    HA_STATS[claimed] += 1
+
+    token = HA_CURRENT_KEY.set(key)
+    HA_OUTSTANDING[key] = HA_OUTSTANDING.get(key, 0) + 1
+    try:
+        handler(*args)
+    finally:
+        HA_CURRENT_KEY.reset(token)
+        #the handler's own share; a message that queued nothing is finished right here
+        ha_release([key])
+
+    if ha_route_state() != HA_SAVED_STATE:
+        HA_STATE_CHANGED.set()
+
+
+def ha_promote(saved_state):
+    global HA_LEADER
+    HA_LEADER = True
+    HA_STATS["promoted"] += 1
+    if saved_state:
+        ha_apply_route_state(saved_state)
+
+    log.warning(
+        "HA: %s is now the leader (epoch %s); checking %s recent messages the old leader may not have finished",
+        BRIDGE_HA_NODE_ID, HA_LEASE.epoch, len(HA_PENDING)
+    )
+    ha_replay()
+    #anything held in the mesh queue may go now
+    MESH_TX_QUEUE.notify()
+
+
+def ha_replay():
+    _trim_pending()
+    pending = list(HA_PENDING)
+    HA_PENDING.clear()
+    for _, key, handler, args in pending:
+        spawn(ha_run(key, handler, args))
+
+
+def ha_demote(reason="lease taken over by another bridge"):
+    global HA_LEADER
+    HA_LEADER = False
+    HA_STATS["demoted"] += 1
+    #the new leader takes over our unfinished claims; sending our copies as well would double them
+    dropped = MESH_TX_QUEUE.drop_held() + SIGNAL_OUTBOX.drop_held()
+    HA_OUTSTANDING.clear()
+    log.warning(
+        "HA: %s; %s is standing by (%s unsent messages left to the next leader)",
+        reason, BRIDGE_HA_NODE_ID, dropped
+    )
+
+
+async def ha_forget_sent():
+    #standby: messages a leader has finished with need no replay
+    if not HA_PENDING:
+        return
+    keys = {entry[1] for entry in HA_PENDING}
+    try:
+        done = await BRIDGE_LOOP.run_in_executor(HA_LEASE_EXECUTOR, HA_LEASE.sent_keys, keys)
+    except sqlite3.Error:
+        return
+    if done:
+        kept = [entry for entry in HA_PENDING if entry[1] not in done]
+        HA_PENDING.clear()
+        HA_PENDING.extend(kept)
+
+
+async def ha_lease_loop():
+    global HA_SAVED_STATE, HA_RENEWED_AT
+    first = True
+    while True:
+        state = ha_route_state()
+        try:
+            leader, saved_state = await BRIDGE_LOOP.run_in_executor(HA_LEASE_EXECUTOR, HA_LEASE.renew, state)
+        except sqlite3.Error as e:
+            log.warning("HA lease %s unreachable: %s", HA_LEASE.path, e)
+            #a leader that can't renew steps down before its lease can run out, since by then
+            #the standby is free to take over; a standby can't take over without the file
+            expiring = time.monotonic() - HA_RENEWED_AT + BRIDGE_HA_LEASE_SECONDS / 3 >= BRIDGE_HA_LEASE_SECONDS
+            leader, saved_state = HA_LEADER and not expiring, None
+            if HA_LEADER and expiring:
+                ha_demote(f"lease can't be renewed and runs out within {BRIDGE_HA_LEASE_SECONDS / 3:g}s")
+        else:
+            HA_RENEWED_AT = time.monotonic()
+            if leader:
+                HA_SAVED_STATE = state
+                #messages held while claims failed
+                if HA_LEADER and HA_PENDING:
+                    ha_replay()
+
+        if leader and not HA_LEADER:
+            ha_promote(saved_state)
+        elif not leader and HA_LEADER:
+            ha_demote()
+        elif first and not leader:
+            #sends journaled while we last led are the leader's business now
+            dropped = MESH_TX_QUEUE.drop_held() + SIGNAL_OUTBOX.drop_held()
+            log.info("HA: another bridge holds the lease; %s is standing by", BRIDGE_HA_NODE_ID)
+            if dropped:
+                log.info("HA: left %s unsent messages from before the restart to the leader", dropped)
+        first = False
+
+        if not HA_LEADER:
+            await ha_forget_sent()
+
+        HA_STATE_CHANGED.clear()
+        try:
+            await asyncio.wait_for(HA_STATE_CHANGED.wait(), BRIDGE_HA_LEASE_SECONDS / 3)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_ha():
+    if not HA_ENABLED:
+        return
+    metric_gauge("bridge_ha_leader", lambda: int(HA_LEADER))
+    metric_gauge("bridge_ha_total", lambda: dict(HA_STATS), by="event")
+    spawn(ha_lease_loop(), name="ha-lease")
+
 # -------------------------
 # Mesh receive handler
 # -------------------------
 
-# Set by main() after connecting to the device
-BRIDGE_NODE_ID = None
 
 def on_mesh_message(packet, interface):
+    #meshtastic's pubsub thread: only text packets are worth a trip to the bridge loop
+    radio = radio_for_interface(interface)
+    if radio is not None:
+        radio.mark_ok()
+    decoded = packet.get("decoded")
+    if not decoded or not decoded.get("text"):
+        return
+    #the same packet heard again (another radio, a rebroadcast) is dropped before it costs anything
+    if packet.get("id") and not MESH_DEDUPE.check((packet.get("from"), packet["id"])):
+        return
+    on_loop(handle_mesh_packet, packet, interface)
+
+
+def handle_mesh_packet(packet, interface):
     try:
         decoded = packet.get("decoded")
         if not decoded:
             return
 
         pkt_channel = packet.get("channel")
-        if MESH_CHANNEL_INDEX != 0:
-            if pkt_channel != MESH_CHANNEL_INDEX:
-                return
-        else:
-            if pkt_channel is not None and pkt_channel != 0:
-                return
+        if decoded.get("text"):
+            hop_start = packet.get("hopStart")
+            hop_limit = packet.get("hopLimit")
+            metric_inc(
+                "bridge_mesh_packets_total",
+                channel=pkt_channel or 0,
+                hops=hop_start - hop_limit if hop_start is not None and hop_limit is not None else "unknown",
+            )
+
+        #the radio leaves "channel" out for the primary channel
+        routes = ROUTES_BY_CHANNEL.get(pkt_channel or 0)
+        if not routes:
+            return
 
         text = decoded.get("text")
         if not text:
@@ -508,7 +3062,7 @@ def on_mesh_message(packet, interface):
 
         # MESH_TO_SIGNAL=echo: only log messages sent by the bridge itself
         if MESH_TO_SIGNAL == "echo":
-            if node_id == BRIDGE_NODE_ID:
+            if node_id in BRIDGE_NODE_IDS:
                 log.info(f"Echo confirmed: {text}")
             return
 
@@ -516,6 +3070,13 @@ def on_mesh_message(packet, interface):
         if text.startswith("["):
             return
 
+        #only traffic the bridge acts on is charged to the sender: plain chat in MODE2/3 costs nothing
+        if not mesh_acts_on(text, routes):
+            return
+
+        if not ingress_allow(node_id):
+            return
+
         label = get_node_display_name(node_id, interface)
         
         #Get hop count
@@ -530,119 +3091,599 @@ def on_mesh_message(packet, interface):
             "node_id": node_id,
             "label": label,
             "hops": hops,
+            "quiet": ingress_is_quiet(node_id),
+            "channel": pkt_channel or 0,
+            "routes": routes,
+            "via": getattr(radio_for_interface(interface), "path", None),
         }
 
 
+        #with HA, only what the bridge acts on (see above) costs a claim in the shared lease file
+        key = ("mesh", packet.get("from"), packet["id"]) if packet.get("id") else None
+        ha_dispatch(key, act_on_mesh_message, text, interface, ctx, packet)
+
+    except Exception as e:
+        log.error("Error handling mesh message: %s", e, exc_info=True)
+        log.error("RAW PACKET: %s", packet)
+
+
+def relaying_routes(routes):
+    # MODE1: allow
+    # MODE2/3: block normal messages (must use !relay)
+    return [
+        route for route in routes
+        if route["enabled"] and route["direction"] != "signal_to_mesh" and route["mode"] == 1
+    ]
+
+
+def mesh_acts_on(text, routes):
+    if text.startswith(COMMAND_PREFIX):
+        return True
+    if not HA_LEADER:
+        #a standby doesn't know the leader's !on/!off/!mode settings, so it keeps anything a route could relay
+        return any(route["direction"] != "signal_to_mesh" for route in routes)
+    return bool(relaying_routes(routes))
+
+
+def act_on_mesh_message(text, interface, ctx, packet):
+    try:
         if handle_mesh_command(text, interface, ctx):
             return
 
-        if not RELAY_ENABLED:
-            return
-        
-        # MODE1: allow
-        # MODE2/3: block normal messages (must use !relay)
-        if RELAY_MODE != 1:
+        #looked up again: a replay after a failover runs with the route settings the old leader left
+        for route in relaying_routes(ctx["routes"]):
+            relay_to_signal(ctx["label"], text, route["group"])
+
+    except Exception as e:
+        log.error("Error handling mesh message: %s", e, exc_info=True)
+        log.error("RAW PACKET: %s", packet)
+
+# -------------------------
+# Signal → Mesh rate limiting
+# -------------------------
+
+class RollingWindowLimiter:
+    #per-key hit counts in a fixed ring of time buckets: checking and counting cost the same
+    #no matter how many messages a key has sent, and memory is one small list per active key.
+    #Monotonic time, like the token buckets: a wall-clock step must not clear or freeze the window
+    PRUNE_EVERY = 3600
+
+    def __init__(self, limit, window=3600, buckets=12):
+        self.limit = limit
+        self.buckets = buckets
+        self.width = window / buckets
+        self._keys = {}
+        self._last_prune = time.monotonic()
+
+    def _ring(self, key, slot):
+        ring = self._keys.get(key)
+        if ring is None:
+            ring = self._keys[key] = {"slot": slot, "counts": [0] * self.buckets}
+
+        #clear the buckets that have rotated out since this key was last seen
+        stale = min(slot - ring["slot"], self.buckets)
+        for i in range(1, stale + 1):
+            ring["counts"][(ring["slot"] + i) % self.buckets] = 0
+        ring["slot"] = slot
+        return ring
+
+    def retry_after(self, key, now=None):
+        #0 if key may send now, else seconds until its oldest counted hit leaves the window
+        if not self.limit:
+            return 0
+        now = now or time.monotonic()
+        slot = int(now // self.width)
+        ring = self._ring(key, slot)
+        if sum(ring["counts"]) < self.limit:
+            return 0
+
+        for age in range(self.buckets - 1, -1, -1):
+            if ring["counts"][(slot - age) % self.buckets]:
+                return (slot - age + self.buckets) * self.width - now
+        return 0
+
+    def hit(self, key, now=None):
+        if not self.limit:
             return
+        now = now or time.monotonic()
+        slot = int(now // self.width)
+        self._ring(key, slot)["counts"][slot % self.buckets] += 1
+
+        if now - self._last_prune > self.PRUNE_EVERY:
+            self._last_prune = now
+            for k in [k for k, ring in self._keys.items() if slot - ring["slot"] >= self.buckets]:
+                del self._keys[k]
+
+
+SIGNAL_USER_LIMITER = RollingWindowLimiter(SIGNAL_RATE_LIMIT_USER)
+SIGNAL_GLOBAL_LIMITER = RollingWindowLimiter(SIGNAL_RATE_LIMIT_GLOBAL)
+
+#sender key, or ("*", group id) for the global limit -> time of the last "limit reached" notice
+_rate_limit_notices = {}
 
+def check_signal_rate_limit(sender_key, sender, exempt_user=False, group_id=None):
+    #returns True if the message may go to the mesh, and counts it
+    #the global limit covers every route: it guards the radio's airtime, not a group
+    now = time.monotonic()
+    wait_user = 0 if exempt_user else SIGNAL_USER_LIMITER.retry_after(sender_key, now)
+    wait_global = SIGNAL_GLOBAL_LIMITER.retry_after("*", now)
+
+    if not wait_user and not wait_global:
+        if not exempt_user:
+            SIGNAL_USER_LIMITER.hit(sender_key, now)
+        SIGNAL_GLOBAL_LIMITER.hit("*", now)
+        return True
+
+    scope = "user" if wait_user else "global"
+    log.info("RATE_LIMIT: skipping Signal → Mesh for %s (%s limit)", sender, scope)
+
+    #the group-wide notice is the same for everyone, so it gets one cooldown per group, not per sender
+    notice_key = sender_key if wait_user else ("*", group_id)
+    last = _rate_limit_notices.get(notice_key)
+    if last is None or now - last >= SIGNAL_RATE_LIMIT_NOTICE_COOLDOWN:
+        _rate_limit_notices[notice_key] = now
+        minutes = max(1, math.ceil(max(wait_user, wait_global) / 60))
+        if wait_user:
+            notice = f"{sender}: limit of {SIGNAL_RATE_LIMIT_USER} messages to the mesh per hour reached."
+        else:
+            notice = f"Mesh relay limit of {SIGNAL_RATE_LIMIT_GLOBAL} messages per hour reached."
         send_to_signal(
-            format_mesh_to_signal(label, text),
-            sender_label=label
+            format_bridge_message(f"{notice} Not relayed. Try again in {minutes} min."),
+            log_relay=False,
+            group_id=group_id,
         )
 
-    except Exception as e:
-        log.error("Error handling mesh message: %s", e, exc_info=True)
-        log.error("RAW PACKET: %s", packet)
+    return False
+
+# -------------------------
+# Mesh → Signal digest
+# -------------------------
+#while a group gets more than SIGNAL_DIGEST_RATE relays a minute, further ones are collected for
+#SIGNAL_DIGEST_WINDOW seconds and posted as one message, so Signal sends (and notifications)
+#stay at about rate + 60/window per minute however busy the mesh gets
+
+SIGNAL_DIGEST_LIMITER = RollingWindowLimiter(SIGNAL_DIGEST_RATE, window=60, buckets=12)
+
+#group id -> [(label, text, HA claim keys), ...] collected for its next digest
+SIGNAL_DIGESTS = {}
+
+def relay_to_signal(label, text, group_id):
+    pending = SIGNAL_DIGESTS.get(group_id)
+    over_rate = SIGNAL_DIGEST_LIMITER.retry_after(group_id) > 0
+    SIGNAL_DIGEST_LIMITER.hit(group_id)
+
+    if pending is None and not over_rate:
+        send_to_signal(format_mesh_to_signal(label, text), sender_label=label, group_id=group_id)
+        return
+
+    if pending is None:
+        pending = SIGNAL_DIGESTS[group_id] = []
+        BRIDGE_LOOP.call_later(SIGNAL_DIGEST_WINDOW, flush_signal_digest, group_id)
+        log.info(
+            "Mesh → Signal over %s/min for %s; collecting a %ss digest",
+            SIGNAL_DIGEST_RATE, group_id, SIGNAL_DIGEST_WINDOW
+        )
+    pending.append((label, text, ha_hold()))
+
+
+def flush_signal_digest(group_id):
+    lines = SIGNAL_DIGESTS.pop(group_id, None)
+    if not lines:
+        return
+    ha_keys = [key for _, _, keys in lines for key in keys or ()]
+    if len(lines) == 1:
+        label, text, _ = lines[0]
+        send_to_signal(format_mesh_to_signal(label, text), sender_label=label, group_id=group_id, ha_keys=ha_keys)
+        return
+
+    metric_inc("bridge_signal_digests_total")
+    metric_inc("bridge_signal_digest_messages_total", len(lines))
+    send_to_signal(
+        render_signal_digest(lines), sender_label=f"digest of {len(lines)}", group_id=group_id, ha_keys=ha_keys
+    )
+
+
+def render_signal_digest(lines):
+    nodes = len({label for label, _, _ in lines})
+    header = format_bridge_message(
+        f"Mesh digest: {len(lines)} messages from {nodes} node{'' if nodes == 1 else 's'} "
+        f"in {SIGNAL_DIGEST_WINDOW}s"
+    )
+    #room kept for the "more not shown" line
+    budget = SIGNAL_DIGEST_MAX_CHARS - len(header) - 40
+
+    body = []
+    for i, (label, text, _) in enumerate(lines):
+        line = format_mesh_to_signal(label, text)
+        if len(line) + 1 > budget:
+            if not body:
+                #one huge message still shows as much of itself as fits
+                line = _truncate_to(line, budget - 1)
+            else:
+                body.append(f"… {len(lines) - i} more not shown")
+                break
+        body.append(line)
+        budget -= len(line) + 1
+    return "\n".join([header, *body])
+
+# -------------------------
+# Sender authorization
+# -------------------------
+#filter, operator and dev mode characters are compiled to sets of grapheme clusters, so 👍🏽 or a
+#ZWJ family emoji is one token and a plain 👍 does not match it. Variation selectors are dropped on
+#both sides first: keyboards add or leave out U+FE0F at will, so 📢️ and 📢 are the same token.
+#What a sender may do is worked out once per (sender, profile name) and reused until their name
+#changes: one dict hit per message
+
+_VARIATION_SELECTORS = str.maketrans("", "", "\ufe0e\ufe0f")
+
+def _tokens(clusters):
+    return frozenset(filter(None, (cluster.translate(_VARIATION_SELECTORS) for cluster in clusters)))
+
+
+DEV_MODE_TOKEN = "\U0001f527"
+
+SENDER_CACHE_MAX = 1024
+
+SENDER_CACHE_STATS = {"hit": 0, "miss": 0}
+
+def compile_filter(chars):
+    #"📢🔔" is two tokens; a list such as ["📢", "🏳️‍🌈"] is taken token by token
+    if isinstance(chars, str):
+        return _tokens(split_graphemes(chars.replace(" ", "")))
+    return _tokens(token.strip() for token in chars if token)
+
+
+ALERT_MATCHER = compile_filter(SIGNAL_ALERT_CHARS)
+
+for _route in ROUTES:
+    _route["matcher"] = compile_filter(_route["filter"])
+
+#sender id -> decisions for their current profile name, least recently seen first
+_sender_cache = collections.OrderedDict()
+
+def sender_profile(env):
+    source = env.get("sourceUuid") or env.get("source") or env.get("sourceNumber") or ""
+    name = env.get("sourceName") or ""
+
+    profile = _sender_cache.get(source)
+    if profile is not None and profile["name"] == name:
+        _sender_cache.move_to_end(source)
+        SENDER_CACHE_STATS["hit"] += 1
+        return profile
+
+    SENDER_CACHE_STATS["miss"] += 1
+    ids = {env.get("sourceUuid"), env.get("source"), env.get("sourceNumber")} - {None, ""}
+    clusters = _tokens(split_graphemes(name))
+    profile = {
+        "name": name,
+        "clusters": clusters,
+        "allowed": not ids.isdisjoint(SIGNAL_ALLOW_SENDERS),
+        "denied": not ids.isdisjoint(SIGNAL_DENY_SENDERS),
+        "dev": DEV_MODE_TOKEN in clusters,
+        "alert": not ALERT_MATCHER.isdisjoint(clusters),
+        #route name -> passes that route's filter, filled in as routes ask
+        "routes": {},
+    }
+    _sender_cache[source] = profile
+    _sender_cache.move_to_end(source)
+    if len(_sender_cache) > SENDER_CACHE_MAX:
+        _sender_cache.popitem(last=False)
+    return profile
+
+
+def sender_passes_filter(profile, route):
+    passes = profile["routes"].get(route["name"])
+    if passes is None:
+        matcher = route["matcher"]
+        passes = profile["allowed"] or not matcher or not matcher.isdisjoint(profile["clusters"])
+        profile["routes"][route["name"]] = passes
+    return passes
 
 # -------------------------
-# Signal polling
+# Signal receive
 # -------------------------
 
+def signal_route_skip(route, profile, sender):
+    #why a Signal message should not go out on this route, or None if it should
+    if route["direction"] == "mesh_to_signal":
+        return "direction"
+
+    if not route["enabled"]:
+        return "relay_off"
+
+    if route["mode"] == 3:
+        return "mode3"
+
+    if route["channel"] == 0:
+        send_to_signal(PRIMARY_BLOCK_MESSAGE, log_relay=False, group_id=route["group"])
+        return "primary_channel"
+
+    if DEV_MODE and not profile["dev"]:
+        log.info("DEV_MODE: skipping Signal → Mesh for %s on %s (no 🔧)", sender, route["name"])
+        return "dev_mode"
+
+    if not sender_passes_filter(profile, route):
+        log.info("SIGNAL_FILTER: skipping Signal → Mesh for %s on %s (no filter char)", sender, route["name"])
+        return "filter_char"
+
+    return None
+
+
 def handle_signal_results(results, iface):
     for item in results:
         env = item.get("envelope", {})
+        metric_inc("bridge_signal_envelopes_total", outcome="received")
 
-        # -------- DROP OLD SIGNAL MESSAGES --------
+        #one post, one relay: the same envelope can arrive twice (stream and poll overlapping, or as
+        #both dataMessage and syncMessage.sentMessage); sender + send time identify it
         msg_time = env.get("timestamp", 0)
-        #if msg_time < BRIDGE_START_TIME:
-        #annoyingly, we compare the senders send time to the bridge startup time;
-        #in practice this causes dropped messages shortly after startup if the senders 
-        #device time doesnt align with our own, this is a dumb fix
-        #to a problem that would be agonizing to explain to a large volume of users
-        #and yes, i have seen this issue in the wild with "normal" usage
-        if msg_time < BRIDGE_START_TIME - (10 * 60 * 1000): #5 minutes
+        sender_id = env.get("sourceUuid") or env.get("source") or env.get("sourceNumber")
+        if msg_time and not SIGNAL_DEDUPE.check((sender_id, msg_time)):
+            metric_inc("bridge_signal_envelopes_total", outcome="duplicate")
             continue
-        # -----------------------------------------
 
-        msg = None
-        group = None
+        ha_dispatch(("signal", sender_id, msg_time) if msg_time else None, handle_signal_envelope, env, iface)
 
-        if "dataMessage" in env:
-            dm = env["dataMessage"]
-            msg = dm.get("message")
-            group = dm.get("groupInfo", {}).get("groupId")
-        elif "syncMessage" in env and "sentMessage" in env["syncMessage"]:
-            sm = env["syncMessage"]["sentMessage"]
-            msg = sm.get("message")
-            group = sm.get("groupInfo", {}).get("groupId")
 
-        if not msg or group != SIGNAL_GROUP_ID or msg.startswith("["):
-            continue
+def handle_signal_envelope(env, iface):
+    msg_time = env.get("timestamp", 0)
 
-        # -------- SIGNAL COMMANDS --------
-        stripped = msg.strip()
-        stripped_lower = stripped.lower()
+    # -------- DROP OLD SIGNAL MESSAGES --------
+    #if msg_time < BRIDGE_START_TIME:
+    #annoyingly, we compare the senders send time to the bridge startup time;
+    #in practice this causes dropped messages shortly after startup if the senders 
+    #device time doesnt align with our own, this is a dumb fix
+    #to a problem that would be agonizing to explain to a large volume of users
+    #and yes, i have seen this issue in the wild with "normal" usage
+    if msg_time < BRIDGE_START_TIME - (10 * 60 * 1000): #5 minutes
+        metric_inc("bridge_signal_envelopes_total", outcome="old")
+        return
+    # -----------------------------------------
+
+    msg = None
+    group = None
+
+    if "dataMessage" in env:
+        dm = env["dataMessage"]
+        msg = dm.get("message")
+        group = dm.get("groupInfo", {}).get("groupId")
+    elif "syncMessage" in env and "sentMessage" in env["syncMessage"]:
+        sm = env["syncMessage"]["sentMessage"]
+        msg = sm.get("message")
+        group = sm.get("groupInfo", {}).get("groupId")
+
+    if not msg:
+        metric_inc("bridge_signal_envelopes_total", outcome="no_text")
+        return
 
-        if stripped_lower == "!status":
-            sender = format_signal_sender_name(env.get("sourceName"), env.get("source"))
-            status_msg = build_status_message()
+    routes = ROUTES_BY_GROUP.get(group)
+    if not routes:
+        metric_inc("bridge_signal_envelopes_total", outcome="wrong_group")
+        return
 
-            rpc_call("send", {
-                "groupId": SIGNAL_GROUP_ID,
-                "message": status_msg
-            })
+    if msg.startswith("["):
+        metric_inc("bridge_signal_envelopes_total", outcome="bridge_message")
+        return
 
-            log.info(f"Executing Signal command: !status ({sender})")
-            continue
-        #!we need some more diagnostic and admin commands on this half of the bridge
-        # -----------------------------------------
+    # -------- SIGNAL COMMANDS --------
+    stripped = msg.strip()
+    stripped_lower = stripped.lower()
 
-        if not RELAY_ENABLED:
-            continue
+    if stripped_lower == "!status":
+        sender = format_signal_sender_name(env.get("sourceName"), env.get("source"))
+        status_msg = build_status_message(routes)
 
-        if RELAY_MODE == 3:
-            continue
+        rpc_submit("send", {
+            "groupId": group,
+            "message": status_msg
+        })
 
-        if MESH_CHANNEL_INDEX == 0:
-            send_to_signal(PRIMARY_BLOCK_MESSAGE, log_relay=False)
-            continue
+        log.info(f"Executing Signal command: !status ({sender})")
+        metric_inc("bridge_signal_envelopes_total", outcome="command")
+        return
+    #!we need some more diagnostic and admin commands on this half of the bridge
+    # -----------------------------------------
 
-        raw_name = env.get("sourceName") or ""
-        sender = format_signal_sender_name(raw_name, env.get("source"))
-        log.info("Signal message from: '%s' (raw: '%s')", sender, raw_name)
-        if DEV_MODE and "\U0001f527" not in raw_name:
-            log.info("DEV_MODE: skipping Signal → Mesh for %s (no 🔧)", sender)
-            continue
+    raw_name = env.get("sourceName") or ""
+    sender = format_signal_sender_name(raw_name, env.get("source"))
+    log.info("Signal message from: '%s' (raw: '%s')", sender, raw_name)
 
-        if SIGNAL_FILTER_ENABLED and not any(ch in raw_name for ch in SIGNAL_FILTER_CHARS):
-            log.info("SIGNAL_FILTER: skipping Signal → Mesh for %s (no filter char)", sender)
-            continue
+    profile = sender_profile(env)
+    if profile["denied"]:
+        log.info("SIGNAL_DENY_SENDERS: skipping Signal → Mesh for %s", sender)
+        metric_inc("bridge_signal_envelopes_total", outcome="denied")
+        return
+
+    channels = []
+    skipped = None
+    for route in routes:
+        skipped = signal_route_skip(route, profile, sender)
+        if skipped is None and route["channel"] not in channels:
+            channels.append(route["channel"])
+    if not channels:
+        metric_inc("bridge_signal_envelopes_total", outcome=skipped)
+        return
+
+    #operators are only held to the group-wide limit
+    alert = profile["alert"]
+    sender_key = env.get("sourceUuid") or env.get("source") or sender
+    if not check_signal_rate_limit(sender_key, sender, exempt_user=alert, group_id=group):
+        metric_inc("bridge_signal_envelopes_total", outcome="rate_limited")
+        return
+
+    metric_inc("bridge_signal_envelopes_total", outcome="relayed")
 
+    for channel in channels:
         send_to_mesh(
             iface,
             format_signal_to_mesh(sender, msg),
             sender_label=sender,
-            log_relay=True
+            log_relay=True,
+            kind="alert" if alert else "relay",
+            parts=segment_signal_to_mesh(sender, msg),
+            channel=channel,
         )
 
-def poll_signal_loop(iface):
+async def poll_signal_once(iface):
+    try:
+        resp = await rpc_call("receive", {})
+        if resp and resp.get("result"):
+            handle_signal_results(resp["result"], iface)
+    except Exception as e:
+        log.warning(f"Signal poll error: {e}")
+
+
+async def poll_signal_loop(iface):
+    while True:
+        await poll_signal_once(iface)
+        await asyncio.sleep(POLL_INTERVAL)
+
+# -------------------------
+# Signal event stream
+# -------------------------
+
+#consecutive failed subscribes before we start polling in between attempts
+STREAM_FALLBACK_AFTER = 3
+STREAM_MAX_BACKOFF = 30
+
+def handle_signal_event(data, iface):
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        log.debug("Signal event stream: ignoring non-JSON event: %s", data)
+        return
+
+    #signal-cli sends the notification params ({"envelope": ..., "account": ...});
+    #tolerate a full JSON-RPC notification too
+    if "params" in payload and "envelope" not in payload:
+        payload = payload["params"]
+
+    if payload.get("envelope"):
+        handle_signal_results([payload], iface)
+
+
+async def read_signal_event_stream(lines, iface):
+    data_lines = []
+    async for line in lines:
+        if line == "":
+            if data_lines:
+                handle_signal_event("\n".join(data_lines), iface)
+                data_lines = []
+            continue
+        #comment lines are keep-alives
+        if line.startswith(":"):
+            continue
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+
+
+async def stream_signal_loop(iface):
+    backoff = 1
+    failures = 0
+
     while True:
+        subscribed = False
         try:
-            resp = rpc_call("receive", {})
-            if resp and resp.get("result"):
-                handle_signal_results(resp["result"], iface)
+            try:
+                lines = await SIGNAL_HTTP.open_stream(SIGNAL_EVENTS_PATH, 5, SIGNAL_STREAM_IDLE_TIMEOUT)
+            except HttpError as e:
+                #older signal-cli builds have no event endpoint; nothing to resubscribe to
+                if e.status != 404:
+                    raise
+                log.warning("Signal event stream not available (HTTP 404). Falling back to polling.")
+                log.warning("Set SIGNAL_RECEIVE_MODE=poll so signal-cli runs with --receive-mode manual.")
+                await poll_signal_loop(iface)
+                return
+
+            subscribed = True
+            failures = 0
+            backoff = 1
+            log.info("Signal event stream subscribed")
+            signal_cli_answered()
+            try:
+                await read_signal_event_stream(lines, iface)
+            finally:
+                await lines.aclose()
+
+            log.info("Signal event stream closed. Resubscribing...")
         except Exception as e:
-            log.warning(f"Signal poll error: {e}")
-        time.sleep(POLL_INTERVAL)
+            if subscribed:
+                log.info("Signal event stream dropped (%r). Resubscribing...", e)
+            else:
+                failures += 1
+                log.warning("Signal event stream subscribe failed: %r", e)
+
+        if subscribed:
+            continue
+
+        #keep messages moving with the old receive call while the stream is down
+        if failures >= STREAM_FALLBACK_AFTER:
+            await poll_signal_once(iface)
+
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, STREAM_MAX_BACKOFF)
+
+# -------------------------
+# Startup
+# -------------------------
+#the radio connect and signal-cli's JVM start run side by side; each phase is timed and
+#the bridge reports ready (BRIDGE_READY_FILE, /ready) only once both ends answer
+
+STARTUP_STARTED = time.monotonic()
+STARTUP_PHASES = {}
+BRIDGE_READY = threading.Event()
+
+def startup_phase(name, started):
+    STARTUP_PHASES[name] = time.monotonic() - started
+    return STARTUP_PHASES[name]
+
+async def wait_for_signal_cli():
+    #the daemon is launched just before us; poll its RPC until it answers "version"
+    started = time.monotonic()
+    deadline = started + SIGNAL_STARTUP_TIMEOUT
+    delay = 0.1
+
+    while True:
+        try:
+            resp = await SIGNAL_HTTP.post_json(SIGNAL_RPC_PATH, _rpc_payload("version", {}), 2)
+            version = resp.get("result", {}).get("version")
+            if version:
+                break
+        except (OSError, asyncio.TimeoutError, HttpError, ValueError, AttributeError):
+            pass
+
+        if time.monotonic() >= deadline:
+            log.warning(
+                "signal-cli did not answer within %ss. Starting anyway; not reporting ready until it does.",
+                SIGNAL_STARTUP_TIMEOUT
+            )
+            return False
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
+    log.info("signal-cli %s ready after %.1fs", version, startup_phase("signal_cli", started))
+    return True
+
+def mark_ready():
+    startup_phase("total", STARTUP_STARTED)
+    log.info("Startup: %s", ", ".join(f"{name} {secs:.1f}s" for name, secs in STARTUP_PHASES.items()))
+    try:
+        with open(BRIDGE_READY_FILE, "w") as f:
+            f.write(f"{time.time():.0f}\n")
+    except OSError as e:
+        log.warning("Could not write ready file %s: %s", BRIDGE_READY_FILE, e)
+    BRIDGE_READY.set()
+
+#startup is done but signal-cli never answered the probe: the first call that gets through reports ready
+READY_AWAITS_SIGNAL = False
+
+def signal_cli_answered():
+    global READY_AWAITS_SIGNAL
+    if READY_AWAITS_SIGNAL:
+        READY_AWAITS_SIGNAL = False
+        log.info("signal-cli answering now")
+        mark_ready()
 
 # -------------------------
 # Main Startup
@@ -652,47 +3693,104 @@ def main():
     log.info("======================================")
     log.info(" Meshtastic ↔ Signal Bridge")
     log.info("======================================")
-    log.info("Device: %s", MESH_DEVICE)
-    log.info("Mesh channel index: %s", MESH_CHANNEL_INDEX)
-    log.info("Signal group: %s", SIGNAL_GROUP_ID)
+    log.info("Device%s: %s", "s" if len(MESH_DEVICES) > 1 else "", ", ".join(MESH_DEVICES))
+    if len(MESH_DEVICES) > 1:
+        log.info("Mesh TX policy: %s", MESH_TX_POLICY)
+    for channel, device in MESH_TX_PINS.items():
+        log.info("Mesh channel %s pinned to %s", channel, device)
+    if BRIDGE_ROUTES_FILE:
+        log.info("Routing table: %s", BRIDGE_ROUTES_FILE)
+    for route in ROUTES:
+        log.info(
+            "Route %s: group %s ↔ channel %s (%s, MODE%s, filter: %s)",
+            route["name"], route["group"], route["channel"], route["direction"],
+            route["mode"], "".join(route["filter"]) or "off",
+        )
+    log.info("Signal receive mode: %s", SIGNAL_RECEIVE_MODE)
     log.info("Poll interval: %s sec", POLL_INTERVAL)
-    log.info("Node DB warmup: %s sec", NODE_DB_WARMUP)
     log.info("Log level: %s", LOG_LEVEL)
     log.info("Signal short names: %s", SIGNAL_SHORT_NAMES)
-    log.info("Relay mode: MODE%s", RELAY_MODE)
     log.info("Dev mode: %s", DEV_MODE)
-    log.info("Signal filter: %s (chars: %s)", SIGNAL_FILTER_ENABLED, "".join(SIGNAL_FILTER_CHARS))
+    if SIGNAL_ALLOW_SENDERS or SIGNAL_DENY_SENDERS:
+        log.info("Signal senders: %s allowed, %s denied", len(SIGNAL_ALLOW_SENDERS), len(SIGNAL_DENY_SENDERS))
     log.info("Mesh → Signal: %s", MESH_TO_SIGNAL)
+    if HA_ENABLED:
+        log.info("High availability: %s, lease %s (%ss)", BRIDGE_HA_NODE_ID, BRIDGE_HA_LEASE_FILE, BRIDGE_HA_LEASE_SECONDS)
     log.info("")
-    log.info("Connecting to Meshtastic on %s...", MESH_DEVICE)
-    
-    iface = SerialInterface(devPath=MESH_DEVICE)
-    log.info("Meshtastic connected")
 
-    # Store bridge node ID for echo detection
-    global BRIDGE_NODE_ID
-    try:
-        info = iface.myInfo
-        my_node_num = info.get("myNodeNum") if isinstance(info, dict) else getattr(info, "my_node_num", None)
-    except Exception:
-        my_node_num = None
-    if my_node_num is not None:
-        BRIDGE_NODE_ID = f"!{my_node_num:08x}"
-        log.info("Bridge node ID: %s", BRIDGE_NODE_ID)
+    asyncio.run(run_bridge())
 
-    log.info("Waiting %s seconds for node database to populate...", NODE_DB_WARMUP)
-    time.sleep(NODE_DB_WARMUP)
-    
-    #Mesh TX queue worker
-    threading.Thread(target=mesh_tx_worker, args=(iface,), daemon=True).start()
 
-    node_count = len(iface.nodes) if hasattr(iface, 'nodes') else 0
-    log.info(f"Node database ready ({node_count} nodes known)")
+async def run_bridge():
+    global BRIDGE_LOOP, READY_AWAITS_SIGNAL
+    BRIDGE_LOOP = asyncio.get_running_loop()
+
+    #Metrics endpoint (METRICS_PORT), up early so /ready can report "starting"
+    metric_gauge("bridge_startup_seconds", lambda: dict(STARTUP_PHASES), by="phase")
+    start_metrics_server()
+
+    #Node names from the last run, kept current from node info events
+    started = time.monotonic()
+    start_node_index()
+    startup_phase("node_index", started)
+
+    #signal-cli is still starting its JVM; probe it while the radio connects
+    signal_probe = spawn(wait_for_signal_cli(), name="signal-probe")
+
+    #radios connect side by side; the bridge runs on whichever of them answered,
+    #and the link supervisor keeps trying the rest
+    started = time.monotonic()
+    connected = await asyncio.gather(*(connect_radio(radio) for radio in MESH_RADIOS))
+    start_radio_supervision()
+    if not any(connected):
+        log.warning("No Meshtastic radio connected yet; waiting for one")
+        await MESH_RADIO_UP.wait()
+    log.info(
+        "Meshtastic connected after %.1fs (%s of %s radios)",
+        startup_phase("radio", started), sum(radio.healthy() for radio in MESH_RADIOS), len(MESH_RADIOS)
+    )
+    iface = next(radio.iface for radio in MESH_RADIOS if radio.iface is not None)
+
+    metric_gauge(
+        "bridge_mesh_airtime_seconds_total",
+        lambda: {radio.path: radio.scheduler.airtime_total for radio in MESH_RADIOS if radio.scheduler},
+        by="device",
+    )
+    metric_gauge("bridge_mesh_radio_up", lambda: {radio.path: int(radio.healthy()) for radio in MESH_RADIOS}, by="device")
+    metric_gauge("bridge_mesh_tx_queue_depth", MESH_TX_QUEUE.qsize)
+    metric_gauge("bridge_mesh_tx_queue_oldest_seconds", MESH_TX_QUEUE.oldest_age)
+    metric_gauge("bridge_mesh_tx_shed_total", lambda: dict(MESH_TX_QUEUE.shed), by="reason")
+    metric_gauge("bridge_mesh_known_nodes", known_mesh_nodes)
+    metric_gauge("bridge_mesh_ingress_total", lambda: dict(INGRESS_STATS), by="outcome")
+    metric_gauge("bridge_dedupe_hits_total", lambda: dict(DEDUPE_HITS), by="cache")
+    metric_gauge("bridge_sender_cache_total", lambda: dict(SENDER_CACHE_STATS), by="result")
+    metric_gauge("bridge_dedupe_entries", lambda: {"mesh": len(MESH_DEDUPE), "signal": len(SIGNAL_DEDUPE)}, by="cache")
+    metric_gauge("bridge_mesh_ack_total", lambda: dict(MESH_ACK_STATS), by="outcome")
+    metric_gauge("bridge_signal_tx_queue_depth", SIGNAL_TX_QUEUE.qsize)
+    metric_gauge("bridge_signal_outbox_depth", lambda: len(SIGNAL_OUTBOX))
+    metric_gauge("bridge_signal_outbox_total", lambda: dict(SIGNAL_OUTBOX.stats), by="outcome")
+    metric_gauge("bridge_signal_breaker_open", lambda: int(SIGNAL_OUTBOX.breaker.state() != "closed"))
+
+    #Resend whatever was still queued when the bridge last stopped
+    start_mesh_tx_journal()
+
+    #Delivery ack tracking (MESH_WANT_ACK)
+    start_mesh_ack_tracking()
+
+    #Mesh TX queue workers, one per radio; a radio that is down takes nothing
+    for radio in MESH_RADIOS:
+        spawn(mesh_tx_worker(radio), name=f"mesh-tx {radio.path}")
+
+    #Signal outbound workers, and the outbox that retries mesh → Signal sends through them
+    start_signal_tx_workers()
+    start_signal_outbox()
+
+    log.info(f"Node database ready ({len(NODE_LABELS)} nodes known)")
     
 
     log.info("")
-    if MESH_CHANNEL_INDEX == 0:
-        log.warning("Signal → Mesh relay is DISABLED while MESH_CHANNEL_INDEX=0")
+    for route in ROUTES_BY_CHANNEL.get(0, []):
+        log.warning("Signal → Mesh relay is DISABLED on route %s while its channel is 0 (Primary)", route["name"])
 
     if MESH_TO_SIGNAL == "on":
         log.info("Mesh commands: !help, !test, !on/!off, !mode[1,2,3], !status, !relay")
@@ -703,14 +3801,30 @@ def main():
 
     log.info("Signal commands: !status")
     log.info("")
+
+    started = time.monotonic()
+    signal_ok = await signal_probe
+    startup_phase("signal_wait", started)
+
+    #Leader election (BRIDGE_HA_LEASE_FILE); only now, once this bridge could take over warm
+    start_ha()
+
     log.info("======================================")
     log.info("Bridge active - relaying messages")
     log.info("======================================")
 
     if MESH_TO_SIGNAL != "off":
-        pub.subscribe(on_mesh_message, "meshtastic.receive")
+        mesh_subscribe(on_mesh_message, "meshtastic.receive")
+
+    if signal_ok:
+        mark_ready()
+    else:
+        READY_AWAITS_SIGNAL = True
 
-    poll_signal_loop(iface)
+    if SIGNAL_RECEIVE_MODE == "stream":
+        await stream_signal_loop(iface)
+    else:
+        await poll_signal_loop(iface)
 
 
 if __name__ == "__main__":
@@ -28,6 +28,12 @@ if ! [[ "$SIGNAL_POLL_INTERVAL" =~ ^[0-9]+$ ]]; then
   STEP1_ISSUES=true
 fi
 
+# SIGNAL_RECEIVE_MODE invalid
+case "${SIGNAL_RECEIVE_MODE,,}" in
+  stream|poll) ;;
+  *) STEP1_ISSUES=true ;;
+esac
+
 # LOG_LEVEL invalid
 case "${LOG_LEVEL^^}" in
   DEBUG|INFO|WARNING|ERROR|CRITICAL) ;;
@@ -45,8 +51,11 @@ if ! [[ "$MESH_CHANNEL_INDEX" =~ ^[0-9]+$ ]]; then
   STEP1_ISSUES=true
 fi
 
-# NODE_DB_WARMUP invalid
-if ! [[ "$NODE_DB_WARMUP" =~ ^[0-9]+$ ]]; then
+# SIGNAL_RATE_LIMIT_USER / SIGNAL_RATE_LIMIT_GLOBAL invalid (empty is allowed, means unlimited)
+if [ -n "$SIGNAL_RATE_LIMIT_USER" ] && ! [[ "$SIGNAL_RATE_LIMIT_USER" =~ ^[0-9]+$ ]]; then
+  STEP1_ISSUES=true
+fi
+if [ -n "$SIGNAL_RATE_LIMIT_GLOBAL" ] && ! [[ "$SIGNAL_RATE_LIMIT_GLOBAL" =~ ^[0-9]+$ ]]; then
   STEP1_ISSUES=true
 fi
 
@@ -61,8 +70,6 @@ if [ "$STEP1_ISSUES" = true ]; then
 fi
 #------------
 
-sleep .5
-
 # ---- SIGNAL_POLL_INTERVAL ----
 #interval in seconds for signal-cli to poll for new messages
 if ! [[ "$SIGNAL_POLL_INTERVAL" =~ ^[0-9]+$ ]]; then
@@ -70,6 +77,18 @@ if ! [[ "$SIGNAL_POLL_INTERVAL" =~ ^[0-9]+$ ]]; then
   echo "SIGNAL_POLL_INTERVAL is missing or invalid. Defaulting to 30."
 fi
 
+# ---- SIGNAL_RECEIVE_MODE ----
+#stream = signal-cli pushes messages to the bridge as they arrive, poll = bridge asks every SIGNAL_POLL_INTERVAL
+case "${SIGNAL_RECEIVE_MODE,,}" in
+  stream|poll)
+    export SIGNAL_RECEIVE_MODE="${SIGNAL_RECEIVE_MODE,,}"
+    ;;
+  *)
+    export SIGNAL_RECEIVE_MODE=stream
+    echo "SIGNAL_RECEIVE_MODE is missing or invalid. Defaulting to stream."
+    ;;
+esac
+
 # ---- LOG_LEVEL ----
 case "${LOG_LEVEL^^}" in
   DEBUG|INFO|WARNING|ERROR|CRITICAL)
@@ -99,10 +118,27 @@ if ! [[ "$MESH_CHANNEL_INDEX" =~ ^[0-9]+$ ]]; then
   echo "MESH_CHANNEL_INDEX is missing or invalid. Defaulting to 1."
 fi
 
-# ---- NODE_DB_WARMUP ----
-if ! [[ "$NODE_DB_WARMUP" =~ ^[0-9]+$ ]]; then
-  export NODE_DB_WARMUP=10
-  echo "NODE_DB_WARMUP is missing or invalid. Defaulting to 10."
+# ---- BRIDGE_HA_LEASE_FILE ----
+#the shared directory has to be mounted; otherwise each bridge would lease a file of its own and both would relay
+if [ -n "$BRIDGE_HA_LEASE_FILE" ] && [ ! -d "$(dirname "$BRIDGE_HA_LEASE_FILE")" ]; then
+  echo -e "\033[33mBRIDGE_HA_LEASE_FILE=$BRIDGE_HA_LEASE_FILE: directory does not exist. Mount the storage shared with the other bridge there.\033[0m"
+  tail -f /dev/null
+fi
+
+# ---- SIGNAL_RATE_LIMIT_USER / SIGNAL_RATE_LIMIT_GLOBAL ----
+#max messages forwarded to mesh per rolling hour; 0 = unlimited
+if ! [[ "$SIGNAL_RATE_LIMIT_USER" =~ ^[0-9]+$ ]]; then
+  if [ -n "$SIGNAL_RATE_LIMIT_USER" ]; then
+    echo "SIGNAL_RATE_LIMIT_USER is invalid. Defaulting to 0 (unlimited)."
+  fi
+  export SIGNAL_RATE_LIMIT_USER=0
+fi
+
+if ! [[ "$SIGNAL_RATE_LIMIT_GLOBAL" =~ ^[0-9]+$ ]]; then
+  if [ -n "$SIGNAL_RATE_LIMIT_GLOBAL" ]; then
+    echo "SIGNAL_RATE_LIMIT_GLOBAL is invalid. Defaulting to 0 (unlimited)."
+  fi
+  export SIGNAL_RATE_LIMIT_GLOBAL=0
 fi
 
 # ---- TZ ----
@@ -119,8 +155,6 @@ fi
 
 echo ""
 
-sleep 1
-
 #-----------------------
 #Step 2 — Check if Signal account is linked, and if not, initiate linking
 #-----------------------
@@ -163,8 +197,6 @@ tail -f /dev/null
 fi
 fi
 
-sleep 1
-
 #-----------------------
 #STEP 3 — Validate SIGNAL_GROUP_ID and MESH_DEVICE .env variables
 #-----------------------
@@ -201,7 +233,17 @@ if [ -z "$SIGNAL_GROUP_ID" ] && [ -n "$SIGNAL_GROUP_NAME" ]; then
   fi
 fi
 
-if [ -z "$SIGNAL_GROUP_ID" ]; then
+#with a routing table the groups come from the file; the bridge checks it on startup
+if [ -n "$BRIDGE_ROUTES_FILE" ]; then
+  if [ ! -f "$BRIDGE_ROUTES_FILE" ]; then
+    echo -e "\033[33mBRIDGE_ROUTES_FILE=$BRIDGE_ROUTES_FILE does not exist.\033[0m"
+    echo "Available Signal groups:"
+    echo ""
+    echo "$GROUP_OUTPUT"
+    echo ""
+    tail -f /dev/null
+  fi
+elif [ -z "$SIGNAL_GROUP_ID" ]; then
   GROUP_EMPTY=true
   NEEDS_GROUP=true
 elif ! echo "$VALID_IDS" | grep -Fxq "$SIGNAL_GROUP_ID"; then
@@ -209,27 +251,36 @@ elif ! echo "$VALID_IDS" | grep -Fxq "$SIGNAL_GROUP_ID"; then
   NEEDS_GROUP=true
 fi
 
-#---- MESH_DEVICE ----
+#---- MESH_DEVICE / MESH_DEVICES ----
 
 SERIAL_DEVICES=$(ls /dev/ttyACM* /dev/ttyUSB* 2>/dev/null || true)
 
-# Resolve symlinks (e.g. /dev/meshtastic -> /dev/ttyACM0)
-RESOLVED_DEVICE="$MESH_DEVICE"
-if [ -L "$MESH_DEVICE" ]; then
-  RESOLVED_DEVICE=$(readlink -f "$MESH_DEVICE")
+#MESH_DEVICES (comma-separated) replaces MESH_DEVICE when set; every listed device is checked
+CHECK_DEVICES="$MESH_DEVICE"
+if [ -n "$MESH_DEVICES" ]; then
+  CHECK_DEVICES="${MESH_DEVICES//,/ }"
 fi
 
-if [ -z "$MESH_DEVICE" ]; then
+if [ -z "${CHECK_DEVICES// /}" ]; then
   NEEDS_MESH=true
+fi
 
-elif [ ! -e "$RESOLVED_DEVICE" ]; then
-  NEEDS_MESH=true
-  MESH_INVALID_REASON="Path does not exist"
+for CHECK_DEVICE in $CHECK_DEVICES; do
+  # Resolve symlinks (e.g. /dev/meshtastic -> /dev/ttyACM0)
+  RESOLVED_DEVICE="$CHECK_DEVICE"
+  if [ -L "$CHECK_DEVICE" ]; then
+    RESOLVED_DEVICE=$(readlink -f "$CHECK_DEVICE")
+  fi
 
-elif [ ! -c "$RESOLVED_DEVICE" ]; then
-  NEEDS_MESH=true
-  MESH_INVALID_REASON="Not a serial character device"
-fi
+  if [ ! -e "$RESOLVED_DEVICE" ]; then
+    NEEDS_MESH=true
+    MESH_INVALID_REASON="$CHECK_DEVICE: Path does not exist"
+
+  elif [ ! -c "$RESOLVED_DEVICE" ]; then
+    NEEDS_MESH=true
+    MESH_INVALID_REASON="$CHECK_DEVICE: Not a serial character device"
+  fi
+done
 
 #-----------------------
 #STEP 4 — If SIGNAL_GROUP_ID or MESH_DEVICE are missing/incorrect, provide next steps
@@ -270,8 +321,8 @@ if [ "$NEEDS_MESH" = true ]; then
   echo ""
 
   # If user provided something, explain why it's wrong
-  if [ -n "$MESH_DEVICE" ]; then
-    echo "Current value: $MESH_DEVICE"
+  if [ -n "${CHECK_DEVICES// /}" ]; then
+    echo "Current value: ${MESH_DEVICES:-$MESH_DEVICE}"
     echo "Reason: $MESH_INVALID_REASON"
     echo ""
   fi
@@ -298,8 +349,6 @@ echo -e "\033[33mFix the above variable(s) in your .env file and rebuild the con
 tail -f /dev/null
 fi
 
-sleep 1
-
 #-----------------------
 #STEP 5 — Bridge startup
 #-----------------------
@@ -309,14 +358,24 @@ sleep 1
 
 #  2>/dev/null 2>&1 &
 
+#on-connection: signal-cli starts receiving once the bridge subscribes to /api/v1/events
+#manual: nothing is received until the bridge calls "receive"
+if [ "$SIGNAL_RECEIVE_MODE" = "poll" ]; then
+  SIGNAL_CLI_RECEIVE_MODE=manual
+else
+  SIGNAL_CLI_RECEIVE_MODE=on-connection
+fi
+
+#not ready until the bridge says so (see HEALTHCHECK in the Dockerfile)
+rm -f "${BRIDGE_READY_FILE:-/tmp/bridge.ready}"
+
+#the bridge connects the radio while the JVM starts, and waits for signal-cli's RPC to answer
 signal-cli daemon \
   --http 0.0.0.0:8080 \
-  --receive-mode manual \
+  --receive-mode "$SIGNAL_CLI_RECEIVE_MODE" \
   --no-receive-stdout \
   --ignore-attachments \
   --ignore-stories \
   2>/dev/null &
 
-sleep 3
-
 exec python -u /bridge/bridge.py
\ No newline at end of file
@@ -0,0 +1,148 @@
+import itertools
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+from pubsub import pub
+
+# -------------------------
+# Fake Meshtastic radio
+# Stands in for meshtastic.serial_interface.SerialInterface: publishes
+# meshtastic.receive packets the way the library does and records every
+# sendText call instead of writing to a serial port.
+# -------------------------
+
+#ModemPreset enum order, same as bridge.LORA_PRESETS
+PRESETS = (
+    "LONG_FAST", "LONG_SLOW", "VERY_LONG_SLOW", "MEDIUM_SLOW", "MEDIUM_FAST",
+    "SHORT_SLOW", "SHORT_FAST", "LONG_MODERATE", "SHORT_TURBO", "LONG_TURBO",
+)
+
+BRIDGE_NODE_NUM = 0x0b1d6e00
+
+
+class FakeRadio:
+    #set by the harness before main() constructs the interface
+    config = {}
+    instances = []
+    _node_nums = itertools.count(BRIDGE_NODE_NUM)
+    #connection attempts so far, by device path
+    _attempts = {}
+
+    def __init__(self, devPath=None, **kwargs):
+        #"devices" holds per-device overrides, keyed by path
+        cfg = dict(FakeRadio.config, **FakeRadio.config.get("devices", {}).get(devPath, {}))
+        self.devPath = devPath
+        attempt = FakeRadio._attempts[devPath] = FakeRadio._attempts.get(devPath, 0) + 1
+        #after a link loss, the next reconnect_failures attempts find no device
+        if 1 < attempt <= 1 + cfg.get("reconnect_failures", 0):
+            raise OSError(f"{devPath}: no such device")
+        self.sent = []
+        self._ids = itertools.count(random.randint(1, 1 << 30))
+        self._lock = threading.Lock()
+
+        self.ack_ratio = cfg.get("ack_ratio", 1.0)
+        self.ack_delay = cfg.get("ack_delay", 1.5)
+        #the first connection drops once this many packets have gone out, like a radio that was
+        #unplugged; sendText raises and the library reports the connection lost
+        self.fail_after = cfg.get("fail_after") if attempt == 1 else None
+
+        preset = cfg.get("preset", "LONG_FAST")
+        lora = SimpleNamespace(
+            use_preset=True,
+            modem_preset=PRESETS.index(preset),
+            bandwidth=0,
+            spread_factor=0,
+            coding_rate=0,
+        )
+        self.localNode = SimpleNamespace(localConfig=SimpleNamespace(lora=lora))
+        #each fake radio is its own node
+        self.node_num = next(FakeRadio._node_nums)
+        self.myInfo = {"myNodeNum": self.node_num}
+
+        bridge_id = f"!{self.node_num:08x}"
+        self.nodes = {
+            bridge_id: {
+                "num": self.node_num,
+                "user": {"id": bridge_id, "shortName": "BRDG", "longName": "Bridge"},
+                "deviceMetrics": {
+                    "channelUtilization": cfg.get("channel_utilization", 0.0),
+                    "airUtilTx": cfg.get("air_util_tx", 0.0),
+                },
+            }
+        }
+        for node_id, short_name in cfg.get("nodes", {}).items():
+            self.add_node(node_id, short_name)
+
+        time.sleep(cfg.get("connect_delay", 0))
+        FakeRadio.instances.append(self)
+        pub.sendMessage("meshtastic.connection.established", interface=self)
+
+    def add_node(self, node_id, short_name):
+        node = self.nodes[node_id] = {
+            "num": int(node_id[1:], 16),
+            "user": {"id": node_id, "shortName": short_name, "longName": short_name},
+        }
+        pub.sendMessage("meshtastic.node.updated", node=node, interface=self)
+
+    # ---- outbound, as called by the bridge ----
+
+    def sendText(self, text, destinationId="^all", wantAck=False, wantResponse=False,
+                 onResponse=None, channelIndex=0, **kwargs):
+        if self.fail_after is not None and len(self.sent) >= self.fail_after:
+            pub.sendMessage("meshtastic.connection.lost", interface=self)
+            raise OSError(f"{self.devPath}: write failed")
+        packet_id = next(self._ids)
+        with self._lock:
+            self.sent.append({
+                "time": time.monotonic(),
+                "text": text,
+                "destination": destinationId,
+                "channel": channelIndex,
+                "want_ack": wantAck,
+                "id": packet_id,
+            })
+
+        if wantAck:
+            acked = random.random() < self.ack_ratio
+            timer = threading.Timer(self.ack_delay, self._routing_reply, (packet_id, acked))
+            timer.daemon = True
+            timer.start()
+
+        return SimpleNamespace(id=packet_id)
+
+    def sendHeartbeat(self):
+        pass
+
+    def close(self):
+        pass
+
+    def _routing_reply(self, packet_id, acked):
+        routing = {} if acked else {"errorReason": "MAX_RETRANSMIT"}
+        packet = {
+            "from": self.node_num,
+            "to": self.node_num,
+            "decoded": {"portnum": "ROUTING_APP", "requestId": packet_id, "routing": routing},
+        }
+        pub.sendMessage("meshtastic.receive.routing", packet=packet, interface=self)
+
+    # ---- inbound, driven by the scenario ----
+
+    def receive_text(self, text, node_id, channel=1, hops=0, hop_start=3, packet_id=None):
+        packet = {
+            "id": packet_id or next(self._ids),
+            "from": int(node_id[1:], 16),
+            "fromId": node_id,
+            "to": 0xffffffff,
+            "toId": "^all",
+            "channel": channel,
+            "hopStart": hop_start,
+            "hopLimit": hop_start - hops,
+            "decoded": {"portnum": "TEXT_MESSAGE_APP", "text": text},
+        }
+        self.receive_packet(packet)
+
+    def receive_packet(self, packet):
+        topic = "meshtastic.receive.text" if (packet.get("decoded") or {}).get("text") else "meshtastic.receive"
+        pub.sendMessage(topic, packet=packet, interface=self)
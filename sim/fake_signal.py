@@ -0,0 +1,157 @@
+import json
+import queue
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# -------------------------
+# Fake signal-cli daemon
+# Serves the two endpoints the bridge uses: JSON-RPC on /api/v1/rpc
+# (single and batch calls, "receive" for poll mode) and the SSE event
+# stream on /api/v1/events. Every "send" is recorded. outage() makes the
+# RPC endpoint answer 503 for a while, like a daemon that is restarting.
+# -------------------------
+
+class FakeSignal:
+    def __init__(self, account="+15550000000", rpc_delay=0.0, port=0):
+        self.account = account
+        self.rpc_delay = rpc_delay
+        self.sent = []
+        self.calls = 0
+        self.down_until = 0.0
+        self._events = queue.Queue()
+        self._lock = threading.Lock()
+        self._timestamps = iter(range(int(time.time() * 1000), 1 << 62))
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="fake-signal", daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+
+    # ---- inbound, driven by the scenario ----
+
+    def push_envelope(self, envelope):
+        self._events.put({"envelope": envelope, "account": self.account})
+
+    def push_group_message(self, text, group_id, source_name, source="+15551230000"):
+        ts = next(self._timestamps)
+        self.push_envelope({
+            "source": source,
+            "sourceNumber": source,
+            "sourceName": source_name,
+            "sourceDevice": 1,
+            "timestamp": ts,
+            "dataMessage": {
+                "timestamp": ts,
+                "message": text,
+                "groupInfo": {"groupId": group_id, "type": "DELIVER"},
+            },
+        })
+
+    def outage(self, seconds):
+        self.down_until = time.monotonic() + seconds
+
+    # ---- JSON-RPC ----
+
+    def _call(self, request):
+        method = request.get("method")
+        with self._lock:
+            self.calls += 1
+
+        if method == "receive":
+            envelopes = []
+            while True:
+                try:
+                    envelopes.append(self._events.get_nowait())
+                except queue.Empty:
+                    break
+            result = envelopes
+        elif method == "send":
+            params = request.get("params") or {}
+            with self._lock:
+                self.sent.append({
+                    "time": time.monotonic(),
+                    "group": params.get("groupId"),
+                    "message": params.get("message"),
+                })
+            result = {"timestamp": next(self._timestamps), "results": []}
+        elif method == "version":
+            result = {"version": "fake"}
+        else:
+            result = {}
+
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, body=b"", content_type="application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if self.path != "/api/v1/rpc":
+                    self._reply(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    body = json.loads(self.rfile.read(length))
+                except ValueError:
+                    self._reply(400)
+                    return
+
+                if time.monotonic() < fake.down_until:
+                    self._reply(503)
+                    return
+
+                if fake.rpc_delay:
+                    time.sleep(fake.rpc_delay)
+
+                if isinstance(body, list):
+                    out = [fake._call(request) for request in body]
+                else:
+                    out = fake._call(body)
+                self._reply(200, json.dumps(out).encode("utf-8"))
+
+            def do_GET(self):
+                if self.path != "/api/v1/events":
+                    self._reply(404)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                try:
+                    while True:
+                        try:
+                            event = fake._events.get(timeout=5)
+                        except queue.Empty:
+                            self.wfile.write(b":\n\n")
+                            self.wfile.flush()
+                            continue
+                        data = json.dumps(event).encode("utf-8")
+                        self.wfile.write(b"event:receive\ndata:" + data + b"\n\n")
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        return Handler
@@ -0,0 +1,354 @@
+"""Offline simulation harness for the bridge.
+
+Runs bridge.main() with its real threads against a fake radio and a fake
+signal-cli daemon, replays a scenario, then reports throughput, queue
+latency percentiles and CPU/memory use.
+
+    python sim/run.py sim/scenarios/signal_burst.json
+    python sim/run.py sim/scenarios/*.json --json
+
+Needs the bridge's own Python dependencies (meshtastic, pypubsub); no
+radio or Signal account.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SIM_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(SIM_DIR), "bridge"))
+
+from fake_radio import FakeRadio
+from fake_signal import FakeSignal
+
+SIM_GROUP_ID = "c2ltLWdyb3VwLWlk"
+
+DEFAULT_ENV = {
+    "SIGNAL_GROUP_ID": SIM_GROUP_ID,
+    "MESH_DEVICE": "/dev/sim",
+    "MESH_CHANNEL_INDEX": "1",
+    "SIGNAL_POLL_INTERVAL": "2",
+    "SIGNAL_SHORT_NAMES": "true",
+    "LOG_LEVEL": "WARNING",
+}
+
+DEFAULT_SENDER = "Sim \U0001f4e2"
+
+# -------------------------
+# Scenario loading
+# -------------------------
+
+def expand_events(scenario, base_dir):
+    #turns scenario "events" (and an optional recorded "replay" file) into a
+    #time-sorted list of (offset seconds, kind, payload)
+    timeline = []
+
+    for event in scenario.get("events", []):
+        repeat = event.get("repeat", 1)
+        every = event.get("every", 0)
+        for i in range(repeat):
+            at = event.get("at", 0) + i * every
+            if "signal" in event:
+                text = event["signal"].format(i=i)
+                if event.get("length"):
+                    text = (text + " ") * (event["length"] // (len(text) + 1) + 1)
+                    text = text[:event["length"]]
+                sender = event.get("sender", DEFAULT_SENDER).format(i=i)
+                timeline.append((at, "signal", {
+                    "text": text,
+                    "sender": sender,
+                    "source": event.get("source", f"+1555{abs(hash(sender)) % 10**7:07d}"),
+                    "group": event.get("group", SIM_GROUP_ID),
+                }))
+            elif "signal_down" in event:
+                #seconds signal-cli's RPC endpoint answers 503
+                timeline.append((at, "signal_down", event["signal_down"]))
+            elif "mesh" in event:
+                timeline.append((at, "mesh", {
+                    "text": event["mesh"].format(i=i),
+                    "node": event.get("node", "!a1b2c3d4").format(i=i),
+                    "channel": event.get("channel", 1),
+                    "hops": event.get("hops", 0),
+                    #index of the radio that hears it, or "all"
+                    "radio": event.get("radio", 0),
+                }))
+
+    #recorded traffic: one JSON object per line, {"t": seconds, "signal": envelope} or {"t": seconds, "mesh": packet}
+    if scenario.get("replay"):
+        path = os.path.join(base_dir, scenario["replay"])
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if "signal" in record:
+                    timeline.append((record["t"], "signal_envelope", record["signal"]))
+                elif "mesh" in record:
+                    timeline.append((record["t"], "mesh_packet", record["mesh"]))
+
+    timeline.sort(key=lambda entry: entry[0])
+    return timeline
+
+# -------------------------
+# Measurement
+# -------------------------
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def match_latencies(injected, delivered, key):
+    #latency from injection to the first delivery containing the injected text
+    latencies = []
+    missing = 0
+    for at, text in injected:
+        probe = text[:40]
+        hit = next((d["time"] for d in delivered if d["time"] >= at and probe in (d[key] or "")), None)
+        if hit is None:
+            missing += 1
+        else:
+            latencies.append(hit - at)
+    return latencies, missing
+
+
+def latency_summary(latencies):
+    return {
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies) if latencies else None,
+    }
+
+# -------------------------
+# Run
+# -------------------------
+
+def track_mesh_in_flight(tx_queue):
+    #qsize() misses items the TX worker is holding while it waits for airtime,
+    #so count accepted puts against done() calls instead
+    state = {"count": 0}
+    lock = threading.Lock()
+    put, done = tx_queue.put, tx_queue.done
+
+    def counting_put(item):
+        accepted = put(item)
+        if accepted:
+            with lock:
+                state["count"] += 1
+        return accepted
+
+    def counting_done(item):
+        with lock:
+            state["count"] -= 1
+        done(item)
+
+    tx_queue.put = counting_put
+    tx_queue.done = counting_done
+    return state
+
+
+def track_signal_in_flight(bridge):
+    #Signal calls submitted but not yet answered
+    pending = set()
+    submit = bridge.rpc_submit
+
+    def tracking_submit(method, params):
+        future = submit(method, params)
+        pending.add(future)
+        future.add_done_callback(pending.discard)
+        return future
+
+    bridge.rpc_submit = tracking_submit
+    return pending
+
+
+def run(scenario, base_dir, drain_timeout):
+    signal = FakeSignal(rpc_delay=scenario.get("signal", {}).get("rpc_delay", 0.0))
+    signal.start()
+
+    data_dir = tempfile.mkdtemp(prefix="bridge-sim-")
+    env = dict(DEFAULT_ENV, SIGNAL_HTTP_URL=signal.url, BRIDGE_DATA_DIR=data_dir)
+    env.update({k: str(v) for k, v in scenario.get("env", {}).items()})
+    os.environ.update(env)
+
+    radio_cfg = dict(scenario.get("radio", {}))
+    nodes = radio_cfg.setdefault("nodes", {})
+    timeline = expand_events(scenario, base_dir)
+    for _, kind, payload in timeline:
+        if kind == "mesh":
+            nodes.setdefault(payload["node"], payload["node"][-4:].upper())
+    FakeRadio.config = radio_cfg
+
+    import bridge
+    bridge.SerialInterface = FakeRadio
+    in_flight = track_mesh_in_flight(bridge.MESH_TX_QUEUE)
+    signal_in_flight = track_signal_in_flight(bridge)
+
+    usage_start = resource.getrusage(resource.RUSAGE_SELF)
+    wall_start = time.monotonic()
+
+    threading.Thread(target=bridge.main, name="bridge-main", daemon=True).start()
+
+    if not bridge.BRIDGE_READY.wait(60):
+        raise RuntimeError("bridge did not become ready")
+    #device paths in connection order; a reconnect replaces a path's FakeRadio instance
+    devices = list(dict.fromkeys(radio.devPath for radio in FakeRadio.instances))
+
+    def current_radios():
+        latest = {radio.devPath: radio for radio in FakeRadio.instances}
+        return [latest[path] for path in devices]
+
+    #let the event stream subscribe before traffic starts
+    time.sleep(scenario.get("settle", 0.5))
+
+    injected_signal = []
+    injected_mesh = []
+    t0 = time.monotonic()
+
+    for at, kind, payload in timeline:
+        delay = t0 + at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        now = time.monotonic()
+
+        if kind == "signal":
+            signal.push_group_message(payload["text"], payload["group"], payload["sender"], payload["source"])
+            if payload["group"] == SIM_GROUP_ID:
+                injected_signal.append((now, payload["text"]))
+        elif kind == "mesh":
+            #a packet heard by several radios arrives once from each, with the same id
+            radios = current_radios()
+            hearing = radios if payload["radio"] == "all" else [radios[payload["radio"]]]
+            packet_id = random.randint(1, 1 << 30)
+            for radio in hearing:
+                radio.receive_text(
+                    payload["text"], payload["node"], channel=payload["channel"], hops=payload["hops"], packet_id=packet_id
+                )
+            if not payload["text"].startswith("!"):
+                injected_mesh.append((now, payload["text"]))
+        elif kind == "signal_down":
+            signal.outage(payload)
+        elif kind == "signal_envelope":
+            signal.push_envelope(payload)
+        elif kind == "mesh_packet":
+            current_radios()[0].receive_packet(payload)
+
+    #wait for both directions to drain
+    replay_end = time.monotonic()
+    deadline = replay_end + drain_timeout
+    while time.monotonic() < deadline:
+        idle = (
+            in_flight["count"] == 0 and not signal_in_flight and not len(bridge.SIGNAL_OUTBOX)
+            and not bridge.SIGNAL_DIGESTS
+            and not bridge.MESH_PENDING_ACKS and not bridge.MESH_RETRIES
+        )
+        if idle and time.monotonic() - replay_end > 2:
+            break
+        time.sleep(0.25)
+
+    wall = time.monotonic() - wall_start
+    usage_end = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = (usage_end.ru_utime - usage_start.ru_utime) + (usage_end.ru_stime - usage_start.ru_stime)
+
+    mesh_sent = sorted((p for radio in FakeRadio.instances for p in radio.sent), key=lambda p: p["time"])
+    signal_sent = list(signal.sent)
+
+    s2m_latency, s2m_missing = match_latencies(injected_signal, mesh_sent, "text")
+    m2s_latency, m2s_missing = match_latencies(injected_mesh, signal_sent, "message")
+
+    _, sf, bw, cr = next(p for p in bridge.LORA_PRESETS if p[0] == radio_cfg.get("preset", "LONG_FAST"))
+    airtime = sum(
+        bridge.lora_time_on_air(len(p["text"].encode("utf-8")) + bridge.MESH_PACKET_OVERHEAD, sf, bw, cr)
+        for p in mesh_sent
+    )
+    active = max(wall, 1e-9)
+
+    return {
+        "scenario": scenario.get("name", "unnamed"),
+        "wall_seconds": round(wall, 2),
+        "signal_to_mesh": {
+            "injected": len(injected_signal),
+            "undelivered": s2m_missing,
+            "mesh_packets": len(mesh_sent),
+            "packets_per_min": round(len(mesh_sent) / active * 60, 2),
+            "airtime_seconds": round(airtime, 2),
+            "latency_seconds": latency_summary(s2m_latency),
+        },
+        "mesh_to_signal": {
+            "injected": len(injected_mesh),
+            "undelivered": m2s_missing,
+            "signal_sends": len(signal_sent),
+            "sends_per_min": round(len(signal_sent) / active * 60, 2),
+            "latency_seconds": latency_summary(m2s_latency),
+        },
+        "radios": {path: sum(len(r.sent) for r in FakeRadio.instances if r.devPath == path) for path in devices},
+        "shed": dict(bridge.MESH_TX_QUEUE.shed),
+        "ingress": dict(bridge.INGRESS_STATS),
+        "dedupe": dict(bridge.DEDUPE_HITS),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_percent": round(100 * cpu / active, 2),
+        "max_rss_mb": round(usage_end.ru_maxrss / 1024, 1),
+    }
+
+
+def format_report(report):
+    def lat(summary):
+        if summary["p50"] is None:
+            return "n/a"
+        return " ".join(f"{k}={summary[k]:.3f}s" for k in ("p50", "p90", "p99", "max"))
+
+    s2m = report["signal_to_mesh"]
+    m2s = report["mesh_to_signal"]
+    return "\n".join([
+        f"== {report['scenario']} ({report['wall_seconds']}s) ==",
+        f"Signal → Mesh: {s2m['injected']} in, {s2m['undelivered']} undelivered, "
+        f"{s2m['mesh_packets']} packets ({s2m['packets_per_min']}/min), ~{s2m['airtime_seconds']}s airtime",
+        f"  latency {lat(s2m['latency_seconds'])}",
+        f"Mesh → Signal: {m2s['injected']} in, {m2s['undelivered']} undelivered, "
+        f"{m2s['signal_sends']} sends ({m2s['sends_per_min']}/min)",
+        f"  latency {lat(m2s['latency_seconds'])}",
+        f"Radios: {report['radios']}",
+        f"Shed: {report['shed']}  Ingress: {report['ingress']}  Duplicates: {report['dedupe']}",
+        f"CPU {report['cpu_seconds']}s ({report['cpu_percent']}%), max RSS {report['max_rss_mb']} MB",
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenario", nargs="+", help="scenario JSON file(s)")
+    parser.add_argument("--json", action="store_true", help="print reports as JSON")
+    parser.add_argument("--drain", type=float, default=300, help="max seconds to wait for queues to drain")
+    args = parser.parse_args()
+
+    #the bridge reads its config at import and keeps module state, so each
+    #scenario runs in its own interpreter
+    if len(args.scenario) > 1:
+        import subprocess
+        extra = (["--json"] if args.json else []) + ["--drain", str(args.drain)]
+        status = 0
+        for path in args.scenario:
+            status |= subprocess.call([sys.executable, os.path.abspath(__file__), path] + extra)
+        sys.exit(status)
+
+    path = args.scenario[0]
+    with open(path, encoding="utf-8") as f:
+        scenario = json.load(f)
+
+    report = run(scenario, os.path.dirname(os.path.abspath(path)), args.drain)
+    print(json.dumps(report, indent=2) if args.json else format_report(report), flush=True)
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main()